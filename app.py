@@ -1,14 +1,20 @@
 import streamlit as st
-import requests
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime, timedelta
-from urllib.parse import unquote
-import yfinance as yf
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
 import time
-import json
+from greeks import MARKET_TZ, gamma_profile, zero_gamma
+from prefetch import PrefetchScheduler
+from chain_cache import ChainCache, snapshot_view
+from level_history import HistoryStore, recording
+from telemetry import RECORDER, span
+from gex_pipeline import (
+    MAX_FETCH_WORKERS, TERM_EXPIRIES,
+    add_exposures, aggregate_term_gex, chain_gamma_contracts, compute_gex, compute_term_gex, fetch_chain,
+    exposure_into_close, fetch_term_structure, find_key_levels, matrix_view, range_slice, snapshot_store,
+    strike_table, summarize_chain,
+)
 
 # ─── PAGE CONFIG ───────────────────────────────────────────────
 st.set_page_config(
@@ -154,243 +160,150 @@ st.markdown("""
 
 # ─── DATA FETCHING ─────────────────────────────────────────────
 
-@st.cache_data(ttl=300)  # Cache 5 minutes
+CHAIN_TTL = 300  # Seconds a fetched chain is served before it is refetched
+
+
+@st.cache_resource(show_spinner=False)
+def get_level_history():
+    """Process-wide intraday level history, appended to by every good fetch"""
+    return HistoryStore()
+
+
+@st.cache_resource(show_spinner=False)
+def get_chain_cache():
+    """Process-wide chain snapshots, shared by reference across sessions and reruns"""
+    return ChainCache(recording(fetch_chain, get_level_history()), ttl=CHAIN_TTL)
+
+
 def fetch_barchart_data(ticker_symbol, expiry_offset=0):
     """Fetch options chain with Greeks from Barchart"""
-    error_log = []
-    
-    try:
-        # Get spot price and expiry dates from yfinance
-        ticker_yf = yf.Ticker(ticker_symbol)
-        expiry_dates = list(ticker_yf.options)
-        
-        if not expiry_dates:
-            error_log.append("ERROR: No expiry dates found")
-            return None, error_log
-        
-        expiry_offset = min(expiry_offset, len(expiry_dates) - 1)
-        next_expiry_date = expiry_dates[expiry_offset]
-        error_log.append(f"✓ Selected expiry: {next_expiry_date}")
-        
-        hist = ticker_yf.history(period="5d")
-        if hist.empty:
-            error_log.append("ERROR: No price history")
-            return None, error_log
-        spot = hist['Close'].iloc[-1]
-        error_log.append(f"✓ Spot price: ${spot:.2f}")
-        
-        # Barchart session setup
-        if ticker_symbol == "SPX":
-            geturl = f'https://www.barchart.com/stocks/quotes/$SPX/volatility-greeks'
-        else:
-            geturl = f'https://www.barchart.com/etfs-funds/quotes/{ticker_symbol}/volatility-greeks'
-        apiurl = 'https://www.barchart.com/proxies/core-api/v1/options/get'
-        
-        getheaders = {
-            'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
-            'accept-encoding': 'gzip, deflate, br',
-            'accept-language': 'en-US,en;q=0.9',
-            'cache-control': 'max-age=0',
-            'upgrade-insecure-requests': '1',
-            'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        }
-        
-        s = requests.Session()
-        r = s.get(geturl, params={'page': 'all'}, headers=getheaders, timeout=15)
-        r.raise_for_status()
-        error_log.append(f"✓ Barchart page: {r.status_code}")
-        
-        cookies = s.cookies.get_dict()
-        if 'XSRF-TOKEN' not in cookies:
-            error_log.append("⚠ No XSRF-TOKEN, trying without...")
-            xsrf = ''
-        else:
-            xsrf = unquote(cookies['XSRF-TOKEN'])
-            error_log.append("✓ Got XSRF token")
-        
-        headers = {
-            'accept': 'application/json',
-            'accept-encoding': 'gzip, deflate, br',
-            'accept-language': 'en-US,en;q=0.9',
-            'referer': geturl,
-            'user-agent': getheaders['user-agent'],
-            'x-xsrf-token': xsrf
-        }
-        
-        # Fetch options chain
-        if ticker_symbol == "SPX":
-            base_sym = "$SPX"
+    result, log, _ = get_chain_cache().get(ticker_symbol, expiry_offset)
+    return result, log
+
+
+# ─── BACKGROUND PREFETCH ───────────────────────────────────────
+ASSETS = ["SPY", "QQQ", "IWM", "SPX"]
+PREFETCH_ENABLED = os.environ.get('GEX_PREFETCH', '1') == '1'
+PREFETCH_SCHEDULE = {
+    'SPY': {'interval': 300, 'expiries': [0, 1, 2]},
+    'QQQ': {'interval': 300, 'expiries': [0, 1, 2]},
+    'IWM': {'interval': 300, 'expiries': [0, 1]},
+    'SPX': {'interval': 300, 'expiries': [0, 1, 2]},
+}
+
+
+@st.cache_resource(show_spinner=False)
+def get_prefetcher():
+    """Process-wide scheduler refreshing PREFETCH_SCHEDULE in the background"""
+    return PrefetchScheduler(recording(fetch_chain, get_level_history()), PREFETCH_SCHEDULE).start()
+
+
+def get_chain(ticker_symbol, expiry_offset=0):
+    """Latest chain for a key as (result, log, age in seconds or None)"""
+    if PREFETCH_ENABLED:
+        snap = get_prefetcher().latest(ticker_symbol, expiry_offset)
+        if snap is not None:
+            log = snap['log'] + [f"✓ Prefetched snapshot, age {snap['age']:.0f}s"]
+            if snap['failing']:
+                log.append("⚠ Upstream failing, serving last good snapshot")
+            return snapshot_view(snap['result'], snap['age'] if snap['failing'] else None), log, snap['age']
+    # Not scheduled or first cycle still running: fall back to the cached fetch
+    result, log = fetch_barchart_data(ticker_symbol, expiry_offset)
+    return result, log, result.get('stale_age') if result is not None else None
+
+
+def refresh_chains(keys):
+    """Refetch only these (ticker, expiry offset) keys, concurrently; a fetch already running is joined"""
+    def refresh(key):
+        if PREFETCH_ENABLED and key in get_prefetcher().jobs:
+            get_prefetcher().refresh_now(*key)
         else:
-            base_sym = ticker_symbol
-            
-        payload = {
-            'baseSymbol': base_sym,
-            'groupBy': 'optionType',
-            'expirationDate': next_expiry_date,
-            'orderBy': 'strikePrice',
-            'orderDir': 'asc',
-            'raw': '1',
-            'fields': 'symbol,strikePrice,lastPrice,volatility,delta,gamma,theta,vega,volume,openInterest,optionType'
-        }
-        
-        r = s.get(apiurl, params=payload, headers=headers, timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        error_log.append(f"✓ API response received")
-        
-        data_list = []
-        for option_type, options in data.get('data', {}).items():
-            for option in options:
-                option['optionType'] = option_type
-                data_list.append(option)
-        
-        if not data_list:
-            error_log.append("ERROR: No options data returned")
-            return None, error_log
-        
-        df = pd.DataFrame(data_list)
-        
-        # Convert numeric columns
-        numeric_cols = ['strikePrice', 'lastPrice', 'volatility', 'delta', 'gamma', 
-                       'theta', 'vega', 'volume', 'openInterest']
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        df['openInterest'] = df['openInterest'].astype(int)
-        df['volume'] = df['volume'].astype(int)
-        
-        calls = df[df['optionType'] == 'Call'].copy()
-        puts = df[df['optionType'] == 'Put'].copy()
-        
-        error_log.append(f"✓ Calls: {len(calls)}, Puts: {len(puts)}")
-        
-        return {
-            'spot': spot,
-            'expiry': next_expiry_date,
-            'expiry_dates': expiry_dates,
-            'calls': calls,
-            'puts': puts,
-            'raw_df': df
-        }, error_log
-        
-    except Exception as e:
-        error_log.append(f"ERROR: {str(e)}")
-        return None, error_log
+            get_chain_cache().refresh(*key)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_FETCH_WORKERS, len(keys)))) as pool:
+        list(pool.map(refresh, keys))
+
 
+OVERVIEW_TIMEOUT = 20  # Seconds the overview waits before giving up on an asset
 
-def compute_gex(calls, puts, spot, contract_mult=100):
-    """Compute Gamma Exposure by strike"""
-    all_strikes = sorted(set(calls['strikePrice'].tolist() + puts['strikePrice'].tolist()))
+
+def asset_summary(ticker_symbol, expiry_offset, range_pct, contract_mult=100):
+    """Fetch one asset and reduce it to its overview card"""
+    result, log, age = get_chain(ticker_symbol, expiry_offset)
+    if result is None:
+        return {'ticker': ticker_symbol,
+                'error': next((e for e in reversed(log) if 'ERROR' in e), 'ERROR: fetch failed')}
     
-    records = []
-    for K in all_strikes:
-        if pd.isna(K) or K <= 0:
-            continue
-        
-        call_row = calls[calls['strikePrice'] == K]
-        put_row = puts[puts['strikePrice'] == K]
-        
-        call_oi = int(call_row['openInterest'].iloc[0]) if not call_row.empty else 0
-        put_oi = int(put_row['openInterest'].iloc[0]) if not put_row.empty else 0
-        call_gamma = float(call_row['gamma'].iloc[0]) if not call_row.empty else 0
-        put_gamma = float(put_row['gamma'].iloc[0]) if not put_row.empty else 0
-        call_delta = float(call_row['delta'].iloc[0]) if not call_row.empty else 0
-        put_delta = float(put_row['delta'].iloc[0]) if not put_row.empty else 0
-        call_vol = int(call_row['volume'].iloc[0]) if not call_row.empty else 0
-        put_vol = int(put_row['volume'].iloc[0]) if not put_row.empty else 0
-        call_iv = float(call_row['volatility'].iloc[0]) if not call_row.empty else 0
-        put_iv = float(put_row['volatility'].iloc[0]) if not put_row.empty else 0
-        
-        # GEX = gamma * OI * 100 * spot
-        # Calls positive, puts negative (MM hedging)
-        call_gex = call_gamma * call_oi * contract_mult * spot
-        put_gex = -put_gamma * put_oi * contract_mult * spot  # Negative for puts
-        net_gex = call_gex + put_gex
-        
-        # Net delta exposure
-        call_dex = call_delta * call_oi * contract_mult
-        put_dex = put_delta * put_oi * contract_mult
-        net_dex = call_dex + put_dex
-        
-        records.append({
-            'strike': K,
-            'call_gex': call_gex,
-            'put_gex': put_gex,
-            'net_gex': net_gex,
-            'call_oi': call_oi,
-            'put_oi': put_oi,
-            'total_oi': call_oi + put_oi,
-            'call_vol': call_vol,
-            'put_vol': put_vol,
-            'total_vol': call_vol + put_vol,
-            'call_gamma': call_gamma,
-            'put_gamma': put_gamma,
-            'total_gamma': call_gamma * call_oi + put_gamma * put_oi,
-            'call_delta': call_delta,
-            'put_delta': put_delta,
-            'net_dex': net_dex,
-            'call_iv': call_iv,
-            'put_iv': put_iv,
-            'avg_iv': (call_iv + put_iv) / 2 if (call_iv + put_iv) > 0 else 0,
-        })
-    
-    return pd.DataFrame(records)
-
-
-def find_key_levels(gex_df, spot):
-    """Identify key GEX levels: magnet, resistance, support, flip"""
-    if gex_df.empty:
-        return {}
-    
-    # Filter to reasonable range
-    lower = spot * 0.95
-    upper = spot * 1.05
-    nearby = gex_df[(gex_df['strike'] >= lower) & (gex_df['strike'] <= upper)].copy()
-    
-    if nearby.empty:
-        return {}
-    
-    # Gamma Flip: where net_gex crosses zero near spot
-    flip_strike = None
-    for i in range(len(nearby) - 1):
-        if nearby.iloc[i]['net_gex'] * nearby.iloc[i+1]['net_gex'] < 0:
-            s1, s2 = nearby.iloc[i]['strike'], nearby.iloc[i+1]['strike']
-            if abs(s1 - spot) < spot * 0.03 or abs(s2 - spot) < spot * 0.03:
-                flip_strike = (s1 + s2) / 2
-                break
-    
-    # Magnet: highest positive net GEX (price pulled toward)
-    pos_gex = nearby[nearby['net_gex'] > 0]
-    magnet = pos_gex.loc[pos_gex['net_gex'].idxmax(), 'strike'] if not pos_gex.empty else None
-    
-    # Resistance: highest total GEX above spot
-    above = nearby[nearby['strike'] > spot]
-    resistance = above.loc[above['total_gamma'].idxmax(), 'strike'] if not above.empty else None
-    
-    # Support: highest total GEX below spot
-    below = nearby[nearby['strike'] < spot]
-    support = below.loc[below['total_gamma'].idxmax(), 'strike'] if not below.empty else None
-    
-    # Max Put Wall (major support)
-    put_wall = nearby.loc[nearby['put_oi'].idxmax(), 'strike'] if nearby['put_oi'].max() > 0 else None
-    
-    # Max Call Wall (major resistance)
-    call_wall = nearby.loc[nearby['call_oi'].idxmax(), 'strike'] if nearby['call_oi'].max() > 0 else None
-    
-    # Determine gamma regime
-    spot_row = nearby.iloc[(nearby['strike'] - spot).abs().argsort()[:1]]
-    gamma_regime = "POSITIVE" if (not spot_row.empty and spot_row.iloc[0]['net_gex'] > 0) else "NEGATIVE"
+    return {'ticker': ticker_symbol, **summarize_chain(result, range_pct, contract_mult), 'age': age}
+
+
+def fetch_overview(tickers, expiry_offset, range_pct, timeout=OVERVIEW_TIMEOUT):
+    """Overview cards for every ticker, fetched concurrently; a slow or failing asset never blocks the rest"""
+    started = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=len(tickers))
+    futures = {t: pool.submit(asset_summary, t, expiry_offset, range_pct) for t in tickers}
+    done, _ = wait(futures.values(), timeout=timeout)
+    # Stragglers keep running in the background and land in the cache for later
+    pool.shutdown(wait=False, cancel_futures=True)
     
-    return {
-        'magnet': magnet,
-        'resistance': resistance,
-        'support': support,
-        'flip': flip_strike,
-        'put_wall': put_wall,
-        'call_wall': call_wall,
-        'gamma_regime': gamma_regime,
-    }
+    cards = []
+    for t, future in futures.items():
+        if future not in done:
+            cards.append({'ticker': t, 'error': f"⏳ Timed out after {timeout}s"})
+        elif future.exception() is not None:
+            cards.append({'ticker': t, 'error': f"ERROR: {future.exception()}"})
+        else:
+            cards.append(future.result())
+    return cards, time.perf_counter() - started
+
+
+ARCHIVE_INDEX_TTL = 60  # Seconds before newly archived snapshots show up in the replay scrubber
+
+
+@st.cache_data(ttl=ARCHIVE_INDEX_TTL, show_spinner=False)
+def archive_index(ticker_symbol):
+    """Archived snapshots of one ticker with their market-time stamp and session date"""
+    snaps = snapshot_store().list_snapshots(ticker_symbol)
+    snaps['local_ts'] = snaps['ts'].dt.tz_convert(MARKET_TZ)
+    snaps['session'] = snaps['local_ts'].dt.strftime('%Y-%m-%d')
+    return snaps
+
+
+REPLAY_CACHE_SIZE = 96   # Archived snapshots kept computed for the scrubber: about one session at 5-minute fetches
+
+
+@st.cache_resource(max_entries=REPLAY_CACHE_SIZE, show_spinner=False)
+def replay_snapshot(path, contract_mult=100):
+    """Load one archived snapshot with its GEX and key levels (computed once per file, shared by reference)"""
+    from snapshot_store import load_snapshot  # pyarrow is only needed once someone replays
+    
+    snap = load_snapshot(path)
+    gex_df = compute_gex(snap['calls'], snap['puts'], snap['spot'], contract_mult)
+    return snap, gex_df, find_key_levels(gex_df, snap['spot'])
+
+
+SNAPSHOT_CACHE_SIZE = 32   # Snapshots kept with their strike table, levels and exposures
+FIGURE_CACHE_SIZE = 64     # (snapshot, range, ticker) figure sets kept across reruns and sessions
+STYLED_MATRIX_ROWS = 600   # Wider MATRIX / DATA tables skip the per-cell Styler, which re-renders on every rerun
+DATA_COLUMNS = {
+    'strike': 'Strike', 'call_gex': 'Call GEX', 'put_gex': 'Put GEX', 'net_gex': 'Net GEX',
+    'call_oi': 'Call OI', 'put_oi': 'Put OI', 'call_vol': 'Call Vol', 'put_vol': 'Put Vol',
+    'total_gamma': 'Total Γ', 'net_dex': 'Net Δ', 'vanna_ex': 'Vanna', 'charm_ex': 'Charm',
+}
+
+
+@st.cache_resource(max_entries=SNAPSHOT_CACHE_SIZE, show_spinner=False)
+def snapshot_tables(snapshot_key, _build):
+    """Strike table and everything else derived from one snapshot, built once and shared by reference"""
+    with span('strike_table.build'):
+        return _build()
+
+
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def tab_figures(snapshot_key, range_pct, ticker, _build):
+    """Figures, tables and the dealer gamma profile for one snapshot, range and ticker, built once and shared"""
+    with span('figures.build', ticker=ticker):
+        return _build()
 
 
 # ─── HEADER ────────────────────────────────────────────────────
@@ -409,7 +322,7 @@ st.markdown("""
 ctrl_cols = st.columns([1, 1, 1, 1, 3])
 
 with ctrl_cols[0]:
-    ticker = st.selectbox("Asset", ["SPY", "QQQ", "IWM", "SPX"], index=0, label_visibility="collapsed")
+    ticker = st.selectbox("Asset", ASSETS, index=0, label_visibility="collapsed")
 
 with ctrl_cols[1]:
     expiry_idx = st.number_input("Expiry Offset (0=nearest)", min_value=0, max_value=10, value=0, label_visibility="collapsed")
@@ -423,14 +336,114 @@ with ctrl_cols[3]:
 
 with ctrl_cols[4]:
     auto_refresh = st.checkbox("Auto-refresh (5 min)", value=False)
+    term_mode = st.checkbox(f"Σ All expiries (next {TERM_EXPIRIES})", value=False)
+    replay_mode = st.checkbox("⏪ Replay archived session (offline)", value=False)
+    overview_mode = st.checkbox("🗺 Multi-asset overview", value=False)
+
+
+# ─── OVERVIEW ──────────────────────────────────────────────────
+if overview_mode:
+    if refresh:
+        with st.spinner(f"Refreshing {', '.join(ASSETS)}..."):
+            refresh_chains([(t, expiry_idx) for t in ASSETS])
+    
+    with st.spinner(f"Fetching {', '.join(ASSETS)} in parallel..."):
+        cards, elapsed = fetch_overview(ASSETS, expiry_idx, range_pct)
+    
+    st.caption(f"{len(ASSETS)} assets in {elapsed:.1f}s • expiry offset {expiry_idx} • range {strike_range_pct}")
+    ov_cols = st.columns(len(cards))
+    for col, card in zip(ov_cols, cards):
+        with col:
+            if 'error' in card:
+                st.markdown(f"""<div class="metric-card">
+                    <div class="metric-label">{card['ticker']}</div>
+                    <div class="metric-value metric-red" style="font-size:14px">UNAVAILABLE</div>
+                </div>""", unsafe_allow_html=True)
+                st.caption(card['error'])
+                continue
+            
+            card_regime = card['regime']
+            card_net = card['net_gex']
+            fmt = lambda v, d=0: f"${v:,.{d}f}" if v else "—"
+            st.markdown(f"""<div class="metric-card">
+                <div class="metric-label">{card['ticker']} • {card['expiry']}</div>
+                <div class="metric-value metric-white">${card['spot']:.2f}</div>
+                <div class="metric-value {'metric-green' if card_regime == 'POSITIVE' else 'metric-red'}" style="font-size:14px">{card_regime} Γ</div>
+            </div>""", unsafe_allow_html=True)
+            st.markdown(f"""<div class="level-card level-flip">
+                <div class="metric-label">NET GEX</div>
+                <div class="metric-value {'metric-green' if card_net > 0 else 'metric-red'}" style="font-size:16px">{card_net:,.0f}</div>
+            </div>
+            <div class="level-card level-flip">
+                <div class="metric-label">⚖ FLIP</div>
+                <div class="metric-value metric-gold" style="font-size:16px">{fmt(card['flip'])}</div>
+            </div>
+            <div class="level-card level-magnet">
+                <div class="metric-label">🧲 MAGNET</div>
+                <div class="metric-value metric-green" style="font-size:16px">{fmt(card['magnet'])}</div>
+            </div>
+            <div class="level-card level-resist">
+                <div class="metric-label">🔴 CALL WALL</div>
+                <div class="metric-value metric-red" style="font-size:16px">{fmt(card['call_wall'])}</div>
+            </div>
+            <div class="level-card level-support">
+                <div class="metric-label">🟢 PUT WALL</div>
+                <div class="metric-value metric-cyan" style="font-size:16px">{fmt(card['put_wall'])}</div>
+            </div>""", unsafe_allow_html=True)
+            if card['age'] is not None:
+                st.caption(f"snapshot age {card['age']:.0f}s")
+    
+    if auto_refresh:
+        time.sleep(300)
+        st.rerun()
+    st.stop()
 
 
 # ─── FETCH DATA ────────────────────────────────────────────────
-if refresh:
-    st.cache_data.clear()
-
-with st.spinner("Fetching live Greeks from Barchart..."):
-    result, log = fetch_barchart_data(ticker, expiry_idx)
+contract_mult = 100
+as_of = datetime.now()
+data_age = None
+
+if replay_mode:
+    # Replay recorded snapshots from the archive: no network at all
+    snaps = archive_index(ticker)
+    if snaps.empty:
+        st.warning(f"No archived snapshots for {ticker} yet — run live to start recording.")
+        st.stop()
+    
+    rp_cols = st.columns([1, 1, 5])
+    with rp_cols[0]:
+        replay_session = st.selectbox("Session", sorted(snaps['session'].unique(), reverse=True),
+                                      label_visibility="collapsed")
+    session_snaps = snaps[snaps['session'] == replay_session]
+    with rp_cols[1]:
+        replay_expiry = st.selectbox("Expiry", sorted(session_snaps['expiry'].unique()),
+                                     label_visibility="collapsed")
+    session_snaps = session_snaps[session_snaps['expiry'] == replay_expiry].reset_index(drop=True)
+    snap_labels = session_snaps['local_ts'].dt.strftime('%H:%M:%S').tolist()
+    with rp_cols[2]:
+        snap_pos = st.select_slider("Snapshot", options=list(range(len(session_snaps))),
+                                    value=len(session_snaps) - 1, format_func=lambda i: snap_labels[i],
+                                    label_visibility="collapsed")
+    
+    result, replay_gex_df, replay_levels = replay_snapshot(session_snaps['path'].iloc[snap_pos], contract_mult)
+    as_of = session_snaps['local_ts'].iloc[snap_pos]
+    log = [f"✓ Replay snapshot: {as_of:%Y-%m-%d %H:%M:%S %Z} ({snap_pos + 1}/{len(session_snaps)})",
+           f"✓ Calls: {len(result['calls'])}, Puts: {len(result['puts'])}"]
+    if term_mode:
+        log.append("⚠ All-expiry mode is live-only; replaying the selected expiry")
+else:
+    if refresh:
+        with st.spinner("Refreshing live Greeks from Barchart..."):
+            # The selected expiry supplies spot and the debug samples even when it sits past the term window
+            keys = [(ticker, i) for i in range(TERM_EXPIRIES)] if term_mode else []
+            refresh_chains(list(dict.fromkeys(keys + [(ticker, expiry_idx)])))
+    
+    with st.spinner("Fetching live Greeks from Barchart..."):
+        result, log, data_age = get_chain(ticker, expiry_idx)
+        if term_mode and result is not None:
+            term_chains, term_log = fetch_term_structure(ticker, TERM_EXPIRIES, fetch=lambda t, i: get_chain(t, i)[:2])
+            log = log + term_log
 
 if result is None:
     st.error("❌ Failed to fetch data. See debug log below.")
@@ -445,17 +458,51 @@ expiry = result['expiry']
 calls = result['calls']
 puts = result['puts']
 
-# Compute GEX
-contract_mult = 100
-gex_df = compute_gex(calls, puts, spot, contract_mult)
-
-# Filter by range
+if replay_mode:
+    snapshot_key = ('replay', session_snaps['path'].iloc[snap_pos])
+elif term_mode and term_chains:
+    # The selected chain supplies spot and the session history, so it keys the snapshot too
+    snapshot_key = ('term', result['snapshot_id']) + tuple(chain['snapshot_id'] for chain in term_chains)
+    expiry = f"{term_chains[0]['expiry']} → {term_chains[-1]['expiry']}"
+else:
+    snapshot_key = ('live', result['snapshot_id'])
+
+
+def build_snapshot():
+    """GEX, exposures and key levels of this snapshot, as one strike table"""
+    built = {'log': [], 'term_cube': None}
+    if replay_mode:
+        # Replayed snapshots arrive with GEX and levels precomputed
+        gex_df, built['levels'] = replay_gex_df, replay_levels
+    elif snapshot_key[0] == 'term':
+        built['term_cube'] = compute_term_gex(term_chains, spot, contract_mult)
+        gex_df = aggregate_term_gex(built['term_cube'])
+    else:
+        gex_df = compute_gex(calls, puts, spot, contract_mult)
+    if 'levels' not in built:
+        built['levels'] = find_key_levels(gex_df, spot)
+    
+    # Per-contract arrays feed the dealer gamma profile and the vanna / charm / vomma pass
+    contracts = chain_gamma_contracts(term_chains if built['term_cube'] is not None else [result],
+                                      as_of if replay_mode else None)
+    with span('exposures', ticker=ticker, rows=len(contracts[0])):
+        gex_df = add_exposures(gex_df, contracts, spot, contract_mult)
+        built['exposure_path'] = exposure_into_close(contracts, spot, as_of if replay_mode else None,
+                                                     contract_mult=contract_mult)
+    single = built['term_cube'] is None
+    built['table'] = strike_table(gex_df, calls if single else None, puts if single else None)
+    built['contracts'] = contracts
+    return built
+
+
+snapshot = snapshot_tables(snapshot_key, build_snapshot)
+strike_df, levels, term_cube = snapshot['table'], snapshot['levels'], snapshot['term_cube']
+log = log + snapshot['log']
+
+# Every tab reads this ±range view of the snapshot's strike table
 lower_bound = spot * (1 - range_pct)
 upper_bound = spot * (1 + range_pct)
-gex_filtered = gex_df[(gex_df['strike'] >= lower_bound) & (gex_df['strike'] <= upper_bound)].copy()
-
-# Key levels
-levels = find_key_levels(gex_df, spot)
+gex_filtered = range_slice(strike_df, lower_bound, upper_bound)
 
 # ─── METRICS ROW ───────────────────────────────────────────────
 regime = levels.get('gamma_regime', 'UNKNOWN')
@@ -499,89 +546,59 @@ with mcols[5]:
         <div class="metric-value metric-red">{total_put_gex:,.0f}</div>
     </div>""", unsafe_allow_html=True)
 
-st.markdown("<div style='height:8px'></div>", unsafe_allow_html=True)
+if replay_mode:
+    status_badge = f"<span class='status-stale'>⏪ REPLAY • {as_of:%H:%M:%S}</span>"
+elif 'stale_age' in result:
+    status_badge = f"<span class='status-stale'>● STALE • upstream failing • {result['stale_age'] / 60:.0f}m old</span>"
+elif data_age is not None and data_age > 2 * PREFETCH_SCHEDULE.get(ticker, {}).get('interval', 300):
+    status_badge = f"<span class='status-stale'>● STALE • {data_age / 60:.0f}m old</span>"
+elif data_age is not None:
+    status_badge = f"<span class='status-live'>● LIVE • {data_age:.0f}s old</span>"
+else:
+    status_badge = "<span class='status-live'>● LIVE</span>"
+st.markdown(f"<div style='height:8px'></div>{status_badge}", unsafe_allow_html=True)
 
 # ─── TABS ──────────────────────────────────────────────────────
-tab_gex, tab_levels, tab_delta, tab_matrix, tab_data, tab_debug = st.tabs([
-    "📊 GEX PROFILE", "🎯 KEY LEVELS", "🔥 DELTA", "🧱 MATRIX", "📋 DATA", "🔧 DEBUG"
+from charts import dashboard_figures  # Deferred: the overview page and empty replays never draw charts
+
+
+def build_figures():
+    term_net = None
+    if term_cube is not None:
+        term_net = term_cube['net_gex'].unstack('expiry').fillna(0)
+        term_net = term_net[(term_net.index >= lower_bound) & (term_net.index <= upper_bound)]
+    
+    # Dealer gamma across hypothetical spots, priced off each contract's own IV
+    gamma_contracts = snapshot['contracts']
+    with span('gamma_profile', ticker=ticker, rows=len(gamma_contracts[0])):
+        gamma_grid, gamma_curve = gamma_profile(gamma_contracts, spot, width=max(range_pct, 0.05))
+        zero_gamma_level = zero_gamma(gamma_contracts, gamma_grid, gamma_curve, spot)
+    return {
+        **dashboard_figures(gex_filtered, spot, levels, f"0DTE GEX Profile — {ticker} ({expiry})",
+                            gamma_grid, gamma_curve, zero_gamma_level, term_net,
+                            None if replay_mode else get_level_history().frame(ticker, result['expiry']),
+                            snapshot['exposure_path']),
+        'zero_gamma': zero_gamma_level,
+        'matrix': matrix_view(gex_filtered),
+        'data': gex_filtered[list(DATA_COLUMNS)].rename(columns=DATA_COLUMNS).sort_values('Total Γ', ascending=False),
+        'csv': gex_filtered.to_csv(index=False),
+    }
+
+
+figures = tab_figures(snapshot_key, range_pct, ticker, build_figures)
+tab_gex, tab_levels, tab_delta, tab_vanna, tab_matrix, tab_data, tab_debug = st.tabs([
+    "📊 GEX PROFILE", "🎯 KEY LEVELS", "🔥 DELTA", "🌊 VANNA / CHARM", "🧱 MATRIX", "📋 DATA", "🔧 DEBUG"
 ])
 
 
 # ═══ TAB 1: GEX PROFILE ═══════════════════════════════════════
-with tab_gex:
+with tab_gex, span('figures.gex_profile', ticker=ticker):
     col_chart, col_info = st.columns([3, 1])
     
     with col_chart:
-        # Horizontal bar chart (matching the original dashboard style)
-        fig = go.Figure()
-        
-        # Put GEX bars (blue, going right)
-        fig.add_trace(go.Bar(
-            y=gex_filtered['strike'],
-            x=gex_filtered['put_gex'],
-            orientation='h',
-            name='Put GEX',
-            marker=dict(
-                color='rgba(100, 180, 255, 0.75)',
-                line=dict(color='rgba(70, 150, 255, 1)', width=0.5)
-            ),
-            hovertemplate='Strike: $%{y:.0f}<br>Put GEX: %{x:,.0f}<extra></extra>'
-        ))
-        
-        # Call GEX bars (orange, going left — negative for visual)
-        fig.add_trace(go.Bar(
-            y=gex_filtered['strike'],
-            x=-gex_filtered['call_gex'],
-            orientation='h',
-            name='Call GEX',
-            marker=dict(
-                color='rgba(255, 180, 50, 0.75)',
-                line=dict(color='rgba(255, 150, 20, 1)', width=0.5)
-            ),
-            hovertemplate='Strike: $%{y:.0f}<br>Call GEX: %{x:,.0f}<extra></extra>'
-        ))
-        
-        # Spot price line
-        fig.add_hline(
-            y=spot, line_dash="solid", line_color="#ffd700", line_width=3,
-            annotation=dict(
-                text=f"SPOT ${spot:.2f}",
-                font=dict(size=11, color="#ffd700", family="Courier New"),
-                bgcolor="rgba(0,0,0,0.8)", bordercolor="#ffd700", borderwidth=1
-            ),
-            annotation_position="right"
-        )
-        
-        # Key level lines
-        if levels.get('magnet'):
-            fig.add_hline(y=levels['magnet'], line_dash="dot", line_color="#00ff88", line_width=1.5,
-                         annotation=dict(text=f"🧲 MAGNET ${levels['magnet']:.0f}", 
-                                        font=dict(size=9, color="#00ff88"), x=0.02))
-        if levels.get('flip'):
-            fig.add_hline(y=levels['flip'], line_dash="dash", line_color="#ffd700", line_width=1.5,
-                         annotation=dict(text=f"⚖ FLIP ${levels['flip']:.0f}", 
-                                        font=dict(size=9, color="#ffd700"), x=0.02))
-        
-        fig.update_layout(
-            barmode='overlay',
-            height=700,
-            plot_bgcolor='#0a0e1a',
-            paper_bgcolor='#0a0e1a',
-            font=dict(color='#8b9dc3', size=10, family='Courier New'),
-            title=dict(
-                text=f"0DTE GEX Profile — {ticker} ({expiry})",
-                font=dict(color='#00d4ff', size=14),
-                x=0.5
-            ),
-            xaxis=dict(title="← Calls | Puts →", gridcolor='#1a2332', 
-                       zerolinecolor='#2a3442', tickformat=','),
-            yaxis=dict(title="", gridcolor='#1a2332', tickformat='$.0f', side='left'),
-            showlegend=True,
-            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#8b9dc3', size=10)),
-            margin=dict(l=60, r=20, t=40, b=40)
-        )
-        
-        st.plotly_chart(fig, width="stretch", config={'displayModeBar': False})
+        st.plotly_chart(figures['gex_profile'], width="stretch", config={'displayModeBar': False})
+        if figures['bucketed'] > 1:
+            st.caption(f"{len(gex_filtered):,} strikes in range, drawn ~{figures['bucketed']:.0f} adjacent strikes per bar")
     
     with col_info:
         st.markdown("#### 🎯 Key Levels")
@@ -614,6 +631,13 @@ with tab_gex:
                 <div style="color:#5a6a8a;font-size:10px">Regime change zone</div>
             </div>""", unsafe_allow_html=True)
         
+        if figures['zero_gamma']:
+            st.markdown(f"""<div class="level-card level-flip">
+                <div class="metric-label">🌀 ZERO GAMMA</div>
+                <div class="metric-value metric-gold" style="font-size:16px">${figures['zero_gamma']:.2f}</div>
+                <div style="color:#5a6a8a;font-size:10px">Spot where dealer gamma nets to 0</div>
+            </div>""", unsafe_allow_html=True)
+        
         st.markdown("---")
         st.markdown(f"""
         **Gamma Regime: {regime}**
@@ -623,84 +647,27 @@ with tab_gex:
 
     # Net GEX line chart
     st.markdown("#### Net GEX Distribution")
-    fig_net = go.Figure()
-    
-    colors = ['#00ff88' if v > 0 else '#ff4466' for v in gex_filtered['net_gex']]
-    fig_net.add_trace(go.Bar(
-        x=gex_filtered['strike'], y=gex_filtered['net_gex'],
-        marker_color=colors, name='Net GEX',
-        hovertemplate='$%{x:.0f}<br>Net GEX: %{y:,.0f}<extra></extra>'
-    ))
-    fig_net.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2,
-                     annotation=dict(text=f"${spot:.2f}", font=dict(color="#ffd700", size=10)))
-    
-    fig_net.update_layout(
-        height=350, plot_bgcolor='#0a0e1a', paper_bgcolor='#0a0e1a',
-        font=dict(color='#8b9dc3', size=10, family='Courier New'),
-        xaxis=dict(title="Strike", gridcolor='#1a2332', tickformat='$.0f'),
-        yaxis=dict(title="Net GEX", gridcolor='#1a2332', tickformat=','),
-        margin=dict(l=60, r=20, t=20, b=40)
-    )
-    st.plotly_chart(fig_net, width="stretch", config={'displayModeBar': False})
+    st.plotly_chart(figures['net_gex'], width="stretch", config={'displayModeBar': False})
+    
+    # Strike × expiry heatmap (term-structure mode only)
+    if 'term' in figures:
+        st.markdown("#### Net GEX by Strike × Expiry")
+        st.plotly_chart(figures['term'], width="stretch", config={'displayModeBar': False})
 
 
 # ═══ TAB 2: KEY LEVELS ════════════════════════════════════════
-with tab_levels:
+with tab_levels, span('figures.key_levels', ticker=ticker):
     lev_col1, lev_col2 = st.columns(2)
     
     with lev_col1:
         st.markdown("### 🏛 OI Profile (Open Interest)")
         
-        fig_oi = make_subplots(rows=1, cols=1)
-        
-        fig_oi.add_trace(go.Bar(
-            x=gex_filtered['strike'], y=gex_filtered['call_oi'],
-            name='Call OI', marker_color='rgba(255,180,50,0.7)',
-            hovertemplate='$%{x:.0f}<br>Call OI: %{y:,.0f}<extra></extra>'
-        ))
-        fig_oi.add_trace(go.Bar(
-            x=gex_filtered['strike'], y=-gex_filtered['put_oi'],
-            name='Put OI', marker_color='rgba(100,180,255,0.7)',
-            hovertemplate='$%{x:.0f}<br>Put OI: %{y:,.0f}<extra></extra>'
-        ))
-        
-        fig_oi.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
-        
-        fig_oi.update_layout(
-            barmode='overlay', height=500,
-            plot_bgcolor='#0a0e1a', paper_bgcolor='#0a0e1a',
-            font=dict(color='#8b9dc3', family='Courier New'),
-            xaxis=dict(gridcolor='#1a2332', tickformat='$.0f'),
-            yaxis=dict(gridcolor='#1a2332', tickformat=','),
-            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#8b9dc3')),
-            margin=dict(l=60, r=20, t=20, b=40)
-        )
-        st.plotly_chart(fig_oi, width="stretch", config={'displayModeBar': False})
+        st.plotly_chart(figures['oi'], width="stretch", config={'displayModeBar': False})
     
     with lev_col2:
         st.markdown("### 📊 Volume Profile")
         
-        fig_vol = go.Figure()
-        fig_vol.add_trace(go.Bar(
-            x=gex_filtered['strike'], y=gex_filtered['call_vol'],
-            name='Call Vol', marker_color='rgba(255,180,50,0.7)',
-        ))
-        fig_vol.add_trace(go.Bar(
-            x=gex_filtered['strike'], y=-gex_filtered['put_vol'],
-            name='Put Vol', marker_color='rgba(100,180,255,0.7)',
-        ))
-        fig_vol.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
-        
-        fig_vol.update_layout(
-            barmode='overlay', height=500,
-            plot_bgcolor='#0a0e1a', paper_bgcolor='#0a0e1a',
-            font=dict(color='#8b9dc3', family='Courier New'),
-            xaxis=dict(gridcolor='#1a2332', tickformat='$.0f'),
-            yaxis=dict(gridcolor='#1a2332', tickformat=','),
-            legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#8b9dc3')),
-            margin=dict(l=60, r=20, t=20, b=40)
-        )
-        st.plotly_chart(fig_vol, width="stretch", config={'displayModeBar': False})
+        st.plotly_chart(figures['volume'], width="stretch", config={'displayModeBar': False})
     
     # Put/Call ratios
     st.markdown("### 📈 Put/Call Analysis")
@@ -733,30 +700,26 @@ with tab_levels:
             <div class="metric-label">TOTAL VOLUME</div>
             <div class="metric-value metric-gold">{(total_call_vol + total_put_vol):,.0f}</div>
         </div>""", unsafe_allow_html=True)
+    
+    # Dealer gamma if spot moved (Black-Scholes on every contract)
+    st.markdown("### 🌀 Dealer Gamma vs Spot")
+    st.plotly_chart(figures['gamma_profile'], width="stretch", config={'displayModeBar': False})
+    
+    # Levels through the session, from the in-memory history (no refetch)
+    st.markdown(f"### 🕒 Session — {ticker} {result['expiry']}")
+    if replay_mode:
+        st.caption("Session history is recorded from live fetches; scrub the replay slider instead.")
+    elif 'session' in figures:
+        st.plotly_chart(figures['session'], width="stretch", config={'displayModeBar': False})
+    else:
+        st.caption("No history yet for this expiry — it fills in with every refresh.")
 
 
 # ═══ TAB 3: DELTA ═════════════════════════════════════════════
-with tab_delta:
+with tab_delta, span('figures.delta', ticker=ticker):
     st.markdown("### 🔥 Delta Exposure by Strike")
     
-    fig_delta = go.Figure()
-    
-    delta_colors = ['#00ff88' if v > 0 else '#ff4466' for v in gex_filtered['net_dex']]
-    fig_delta.add_trace(go.Bar(
-        x=gex_filtered['strike'], y=gex_filtered['net_dex'],
-        marker_color=delta_colors, name='Net Delta',
-        hovertemplate='$%{x:.0f}<br>Net Δ: %{y:,.0f}<extra></extra>'
-    ))
-    fig_delta.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
-    
-    fig_delta.update_layout(
-        height=500, plot_bgcolor='#0a0e1a', paper_bgcolor='#0a0e1a',
-        font=dict(color='#8b9dc3', family='Courier New'),
-        xaxis=dict(title="Strike", gridcolor='#1a2332', tickformat='$.0f'),
-        yaxis=dict(title="Net Delta Exposure", gridcolor='#1a2332', tickformat=','),
-        margin=dict(l=60, r=20, t=20, b=40)
-    )
-    st.plotly_chart(fig_delta, width="stretch", config={'displayModeBar': False})
+    st.plotly_chart(figures['delta'], width="stretch", config={'displayModeBar': False})
     
     # Delta summary
     total_net_dex = gex_filtered['net_dex'].sum()
@@ -781,99 +744,117 @@ with tab_delta:
     
     # IV Smile
     st.markdown("### 📐 IV Smile")
-    fig_iv = go.Figure()
-    
-    iv_data = gex_filtered[(gex_filtered['call_iv'] > 0) | (gex_filtered['put_iv'] > 0)]
-    
-    fig_iv.add_trace(go.Scatter(
-        x=iv_data['strike'], y=iv_data['call_iv'],
-        mode='lines+markers', name='Call IV',
-        line=dict(color='#ffb832', width=2), marker=dict(size=4)
-    ))
-    fig_iv.add_trace(go.Scatter(
-        x=iv_data['strike'], y=iv_data['put_iv'],
-        mode='lines+markers', name='Put IV',
-        line=dict(color='#64b4ff', width=2), marker=dict(size=4)
-    ))
-    fig_iv.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
-    
-    fig_iv.update_layout(
-        height=400, plot_bgcolor='#0a0e1a', paper_bgcolor='#0a0e1a',
-        font=dict(color='#8b9dc3', family='Courier New'),
-        xaxis=dict(title="Strike", gridcolor='#1a2332', tickformat='$.0f'),
-        yaxis=dict(title="IV (%)", gridcolor='#1a2332'),
-        legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#8b9dc3')),
-        margin=dict(l=60, r=20, t=20, b=40)
-    )
-    st.plotly_chart(fig_iv, width="stretch", config={'displayModeBar': False})
-
-
-# ═══ TAB 4: MATRIX ════════════════════════════════════════════
-with tab_matrix:
+    st.plotly_chart(figures['iv_smile'], width="stretch", config={'displayModeBar': False})
+
+
+# ═══ TAB 4: VANNA / CHARM ═════════════════════════════════════
+with tab_vanna, span('figures.vanna', ticker=ticker):
+    st.markdown("### 🌊 Vanna & Charm Exposure by Strike")
+    
+    v_cols = st.columns(3)
+    for col, (label, column) in zip(v_cols, [("NET VANNA ($Δ / VOL PT)", 'vanna_ex'), ("NET CHARM ($Δ / DAY)", 'charm_ex'),
+                                             ("NET VOMMA ($VEGA / VOL PT)", 'vomma_ex')]):
+        total = gex_filtered[column].sum()
+        with col:
+            st.markdown(f"""<div class="metric-card">
+                <div class="metric-label">{label}</div>
+                <div class="metric-value {'metric-green' if total > 0 else 'metric-red'}">{total:,.0f}</div>
+            </div>""", unsafe_allow_html=True)
+    
+    vc_col1, vc_col2 = st.columns(2)
+    with vc_col1:
+        st.plotly_chart(figures['vanna'], width="stretch", config={'displayModeBar': False})
+    with vc_col2:
+        st.plotly_chart(figures['charm'], width="stretch", config={'displayModeBar': False})
+    
+    st.markdown("### ⏳ Into the Close")
+    if 'exposure_path' in figures:
+        st.plotly_chart(figures['exposure_path'], width="stretch", config={'displayModeBar': False})
+    else:
+        st.caption("Market is closed — charm and vanna paths resume at the next session.")
+    
+    st.markdown("### 📈 Vomma Exposure by Strike")
+    st.plotly_chart(figures['vomma'], width="stretch", config={'displayModeBar': False})
+
+
+# ═══ TAB 5: MATRIX ════════════════════════════════════════════
+with tab_matrix, span('figures.matrix', ticker=ticker):
     st.markdown("### 🧱 Options Matrix")
     
-    # Merge calls and puts into matrix view
-    matrix_calls = calls[['strikePrice', 'lastPrice', 'volume', 'openInterest', 'delta', 'gamma', 'volatility']].copy()
-    matrix_calls.columns = ['Strike', 'C_Last', 'C_Vol', 'C_OI', 'C_Delta', 'C_Gamma', 'C_IV']
-    
-    matrix_puts = puts[['strikePrice', 'lastPrice', 'volume', 'openInterest', 'delta', 'gamma', 'volatility']].copy()
-    matrix_puts.columns = ['Strike', 'P_Last', 'P_Vol', 'P_OI', 'P_Delta', 'P_Gamma', 'P_IV']
-    
-    matrix = matrix_calls.merge(matrix_puts, on='Strike', how='outer').sort_values('Strike')
-    matrix = matrix[(matrix['Strike'] >= lower_bound) & (matrix['Strike'] <= upper_bound)]
-    
-    # Compute net GEX for matrix
-    matrix['Net_GEX'] = (matrix['C_Gamma'].fillna(0) * matrix['C_OI'].fillna(0) - 
-                          matrix['P_Gamma'].fillna(0) * matrix['P_OI'].fillna(0)) * 100 * spot
-    
-    # Format display
-    display_matrix = matrix[['P_OI', 'P_Vol', 'P_IV', 'P_Delta', 'P_Gamma', 'P_Last',
-                            'Strike', 
-                            'C_Last', 'C_Gamma', 'C_Delta', 'C_IV', 'C_Vol', 'C_OI', 'Net_GEX']].copy()
-    
-    st.dataframe(
-        display_matrix.style.format({
-            'Strike': '${:.0f}', 'C_Last': '${:.2f}', 'P_Last': '${:.2f}',
-            'C_Vol': '{:,.0f}', 'P_Vol': '{:,.0f}',
-            'C_OI': '{:,.0f}', 'P_OI': '{:,.0f}',
-            'C_Delta': '{:.3f}', 'P_Delta': '{:.3f}',
-            'C_Gamma': '{:.4f}', 'P_Gamma': '{:.4f}',
-            'C_IV': '{:.1f}', 'P_IV': '{:.1f}',
-            'Net_GEX': '{:,.0f}'
-        }).background_gradient(subset=['Net_GEX'], cmap='RdYlGn', vmin=-abs(matrix['Net_GEX']).max(), vmax=abs(matrix['Net_GEX']).max()),
-        width="stretch",
-        height=700
-    )
-
-
-# ═══ TAB 5: DATA ══════════════════════════════════════════════
+    display_matrix = figures['matrix']
+    
+    if len(display_matrix) <= STYLED_MATRIX_ROWS:
+        net_max = abs(display_matrix['Net_GEX']).max()
+        st.dataframe(
+            display_matrix.style.format({
+                'Strike': '${:.0f}', 'C_Last': '${:.2f}', 'P_Last': '${:.2f}',
+                'C_Vol': '{:,.0f}', 'P_Vol': '{:,.0f}',
+                'C_OI': '{:,.0f}', 'P_OI': '{:,.0f}',
+                'C_Delta': '{:.3f}', 'P_Delta': '{:.3f}',
+                'C_Gamma': '{:.4f}', 'P_Gamma': '{:.4f}',
+                'C_IV': '{:.1f}', 'P_IV': '{:.1f}',
+                'Net_GEX': '{:,.0f}'
+            }).background_gradient(subset=['Net_GEX'], cmap='RdYlGn', vmin=-net_max, vmax=net_max),
+            width="stretch",
+            height=700
+        )
+    else:
+        # Formatted client-side; a Styler over this many cells costs ~1s per rerun
+        st.caption(f"{len(display_matrix):,} strikes — Net GEX shading is off above {STYLED_MATRIX_ROWS} rows")
+        st.dataframe(
+            display_matrix,
+            column_config={
+                'Strike': st.column_config.NumberColumn(format="$%.0f"),
+                'C_Last': st.column_config.NumberColumn(format="$%.2f"),
+                'P_Last': st.column_config.NumberColumn(format="$%.2f"),
+                **{c: st.column_config.NumberColumn(format="localized") for c in ['C_Vol', 'P_Vol', 'C_OI', 'P_OI', 'Net_GEX']},
+                'C_Delta': st.column_config.NumberColumn(format="%.3f"),
+                'P_Delta': st.column_config.NumberColumn(format="%.3f"),
+                'C_Gamma': st.column_config.NumberColumn(format="%.4f"),
+                'P_Gamma': st.column_config.NumberColumn(format="%.4f"),
+                'C_IV': st.column_config.NumberColumn(format="%.1f"),
+                'P_IV': st.column_config.NumberColumn(format="%.1f"),
+            },
+            width="stretch",
+            height=700
+        )
+
+
+# ═══ TAB 6: DATA ══════════════════════════════════════════════
 with tab_data:
     st.markdown("### 📋 GEX Data Table")
     
-    display_df = gex_filtered[['strike', 'call_gex', 'put_gex', 'net_gex', 
-                                'call_oi', 'put_oi', 'call_vol', 'put_vol',
-                                'total_gamma', 'net_dex']].copy()
-    display_df.columns = ['Strike', 'Call GEX', 'Put GEX', 'Net GEX', 
-                          'Call OI', 'Put OI', 'Call Vol', 'Put Vol',
-                          'Total Γ', 'Net Δ']
-    display_df = display_df.sort_values('Total Γ', ascending=False)
-    
-    st.dataframe(
-        display_df.style.format({
-            'Strike': '${:.0f}', 'Call GEX': '{:,.0f}', 'Put GEX': '{:,.0f}',
-            'Net GEX': '{:,.0f}', 'Call OI': '{:,.0f}', 'Put OI': '{:,.0f}',
-            'Call Vol': '{:,.0f}', 'Put Vol': '{:,.0f}',
-            'Total Γ': '{:,.4f}', 'Net Δ': '{:,.0f}'
-        }),
-        width="stretch", height=600
-    )
+    display_df = figures['data']
+    
+    if len(display_df) <= STYLED_MATRIX_ROWS:
+        st.dataframe(
+            display_df.style.format({
+                'Strike': '${:.0f}', 'Call GEX': '{:,.0f}', 'Put GEX': '{:,.0f}',
+                'Net GEX': '{:,.0f}', 'Call OI': '{:,.0f}', 'Put OI': '{:,.0f}',
+                'Call Vol': '{:,.0f}', 'Put Vol': '{:,.0f}',
+                'Total Γ': '{:,.4f}', 'Net Δ': '{:,.0f}', 'Vanna': '{:,.0f}', 'Charm': '{:,.0f}'
+            }),
+            width="stretch", height=600
+        )
+    else:
+        # Same cutoff as the matrix: formatted client-side instead of by a per-cell Styler
+        st.dataframe(
+            display_df,
+            column_config={
+                'Strike': st.column_config.NumberColumn(format="$%.0f"),
+                'Total Γ': st.column_config.NumberColumn(format="%.4f"),
+                **{c: st.column_config.NumberColumn(format="localized")
+                   for c in ['Call GEX', 'Put GEX', 'Net GEX', 'Call OI', 'Put OI', 'Call Vol', 'Put Vol',
+                             'Net Δ', 'Vanna', 'Charm']},
+            },
+            width="stretch", height=600
+        )
     
     # Download
-    csv = gex_filtered.to_csv(index=False)
-    st.download_button("📥 Download CSV", csv, f"gex_{ticker}_{expiry}.csv", "text/csv")
+    st.download_button("📥 Download CSV", figures['csv'], f"gex_{ticker}_{expiry}.csv", "text/csv")
 
 
-# ═══ TAB 6: DEBUG ═════════════════════════════════════════════
+# ═══ TAB 7: DEBUG ═════════════════════════════════════════════
 with tab_debug:
     st.markdown("### 🔧 Debug / Fetch Log")
     for entry in log:
@@ -884,6 +865,40 @@ with tab_debug:
         else:
             st.success(entry)
     
+    if PREFETCH_ENABLED:
+        st.markdown("### ⏱ Prefetch Scheduler")
+        health = get_prefetcher().health()
+        st.text(f"Scheduler {'alive' if health['alive'] else 'DEAD'} • uptime {health['uptime_s']:.0f}s")
+        st.dataframe(pd.DataFrame(health['jobs']), width="stretch", hide_index=True)
+    
+    st.markdown("### ⏱ Stage Latency")
+    stage_rows = RECORDER.summary()
+    if stage_rows:
+        st.dataframe(pd.DataFrame(stage_rows), width="stretch", hide_index=True)
+        exp_cols = st.columns(2)
+        with exp_cols[0]:
+            st.download_button("⬇ Spans (JSON lines)", RECORDER.to_jsonl(), file_name="gex_spans.jsonl",
+                               mime="application/x-ndjson", width="stretch")
+        with exp_cols[1]:
+            st.download_button("⬇ Metrics (Prometheus)", RECORDER.to_prometheus(), file_name="gex_metrics.prom",
+                               mime="text/plain", width="stretch")
+    
+    st.markdown("### 🛡 Upstreams")
+    from upstream import upstream_stats
+    if upstream_stats():
+        st.dataframe(pd.DataFrame(upstream_stats()), width="stretch", hide_index=True)
+    
+    st.markdown("### 🗄 Chain Cache")
+    cache_stats = get_chain_cache().stats()
+    st.text(f"{cache_stats['entries']} snapshots • {cache_stats['hits']} hits • {cache_stats['misses']} misses • "
+            f"{cache_stats['joins']} joined • {cache_stats['stale_served']} served stale • "
+            f"{cache_stats['in_flight']} in flight")
+    if cache_stats['snapshots']:
+        st.dataframe(pd.DataFrame(cache_stats['snapshots']), width="stretch", hide_index=True)
+    history_stats = get_level_history().stats()
+    st.text(f"Level history: {history_stats['keys']} keys • {history_stats['rows']} rows • "
+            f"{history_stats['bytes'] / 1024:.0f} KB")
+    
     st.markdown("### Raw Data Sample")
     with st.expander("Calls (first 10)"):
         st.dataframe(calls.head(10))
@@ -895,13 +910,13 @@ with tab_debug:
 st.markdown("---")
 st.markdown(f"""
 <div style="text-align:center; color:#5a6a8a; font-family:'Courier New'; font-size:11px;">
-    💾 Data: Barchart.com | ⏰ {datetime.now().strftime('%H:%M:%S %Y-%m-%d')} | 
+    💾 Data: Barchart.com{' (replay)' if replay_mode else ''} | ⏰ {as_of.strftime('%H:%M:%S %Y-%m-%d')} | 
     📊 {ticker} {expiry} | ⚠️ Educational purposes only
 </div>
 """, unsafe_allow_html=True)
 
 
 # ─── AUTO REFRESH ──────────────────────────────────────────────
-if auto_refresh:
+if auto_refresh and not replay_mode:
     time.sleep(300)
     st.rerun()
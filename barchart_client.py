@@ -0,0 +1,122 @@
+import os
+import threading
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from upstream import guard
+from telemetry import span
+
+
+# Overridable so the offline load harness (mock_upstream.py) can stand in for Barchart
+BASE_URL = os.environ.get('BARCHART_BASE_URL', 'https://www.barchart.com').rstrip('/')
+API_URL = f'{BASE_URL}/proxies/core-api/v1/options/get'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+PAGE_HEADERS = {
+    'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
+    'accept-encoding': 'gzip, deflate, br',
+    'accept-language': 'en-US,en;q=0.9',
+    'cache-control': 'max-age=0',
+    'upgrade-insecure-requests': '1',
+    'user-agent': USER_AGENT,
+}
+
+# Status codes Barchart answers with when the XSRF token / session cookie is stale
+TOKEN_REJECTED = (401, 403, 419)
+
+# Fail fast on a dead connection, be patient with a slow body
+CONNECT_TIMEOUT = 3.05
+HOST = urlparse(API_URL).hostname
+
+
+def page_url(ticker_symbol):
+    """Barchart volatility-greeks page for a ticker (also used as the API referer)"""
+    if ticker_symbol == "SPX":
+        return f'{BASE_URL}/stocks/quotes/$SPX/volatility-greeks'
+    return f'{BASE_URL}/etfs-funds/quotes/{ticker_symbol}/volatility-greeks'
+
+
+def base_symbol(ticker_symbol):
+    """Barchart's symbol for the underlying"""
+    return "$SPX" if ticker_symbol == "SPX" else ticker_symbol
+
+
+class BarchartSession:
+    """
+    Long-lived, connection-pooled Barchart session.
+
+    The cookie jar and XSRF token survive across calls and tickers; the
+    volatility-greeks page is only downloaded again when the API rejects
+    the token. Every request goes through the shared upstream guard for
+    the Barchart host (rate limit, retries, circuit breaker).
+    """
+
+    def __init__(self, pool_size=8):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.xsrf = None
+        self.bootstraps = 0
+        self._lock = threading.Lock()
+
+    def bootstrap(self, ticker_symbol, error_log, stale_token=None):
+        """Download the greeks page to (re)harvest the XSRF-TOKEN cookie"""
+        with self._lock:
+            # Another thread already replaced the token we saw rejected
+            if self.xsrf is not None and self.xsrf != stale_token:
+                return self.xsrf
+
+            with span('barchart.page', ticker=ticker_symbol) as s:
+                r = guard(HOST).call(lambda: self.session.get(
+                    page_url(ticker_symbol), params={'page': 'all'}, headers=PAGE_HEADERS,
+                    timeout=(CONNECT_TIMEOUT, 15)), error_log)
+                s['bytes'] = len(r.content)
+            r.raise_for_status()
+            self.bootstraps += 1
+            error_log.append(f"✓ Barchart page: {r.status_code}")
+
+            token = self.session.cookies.get('XSRF-TOKEN')
+            if token is None:
+                error_log.append("⚠ No XSRF-TOKEN, trying without...")
+                self.xsrf = ''
+            else:
+                self.xsrf = unquote(token)
+                error_log.append("✓ Got XSRF token")
+            return self.xsrf
+
+    def get_options(self, ticker_symbol, params, error_log, timeout=10):
+        """GET the options API, re-bootstrapping once if the token is rejected"""
+        xsrf = self.xsrf
+        if xsrf is None:
+            xsrf = self.bootstrap(ticker_symbol, error_log)
+        else:
+            error_log.append("✓ Reusing Barchart session (XSRF cached)")
+
+        r = self._get_api(ticker_symbol, params, xsrf, error_log, timeout)
+        if r.status_code in TOKEN_REJECTED:
+            error_log.append(f"⚠ XSRF token rejected ({r.status_code}), re-bootstrapping...")
+            xsrf = self.bootstrap(ticker_symbol, error_log, stale_token=xsrf)
+            r = self._get_api(ticker_symbol, params, xsrf, error_log, timeout)
+        r.raise_for_status()
+        return r
+
+    def _get_api(self, ticker_symbol, params, xsrf, error_log, timeout):
+        with span('barchart.api', ticker=ticker_symbol) as s:
+            r = guard(HOST).call(lambda: self.session.get(
+                API_URL, params=params, headers=self._api_headers(ticker_symbol, xsrf),
+                timeout=(CONNECT_TIMEOUT, timeout)), error_log)
+            s['bytes'], s['status'] = len(r.content), r.status_code
+        return r
+
+    def _api_headers(self, ticker_symbol, xsrf):
+        return {
+            'accept': 'application/json',
+            'accept-encoding': 'gzip, deflate, br',
+            'accept-language': 'en-US,en;q=0.9',
+            'referer': page_url(ticker_symbol),
+            'user-agent': USER_AGENT,
+            'x-xsrf-token': xsrf,
+        }
@@ -0,0 +1,148 @@
+"""
+Benchmarks for the GEX path on synthetic chains.
+
+Times compute_gex, the vanna/charm/vomma pass (add_exposures),
+find_key_levels and building the strike table plus its MATRIX tab view from
+50 to 20,000 strikes per side, with peak traced memory per call, and
+writes the results as JSON. With --check the run fails when any median or
+peak exceeds bench_thresholds.json.
+
+    python bench_gex.py                                  # run, write bench_results.json
+    python bench_gex.py --check                          # ...and enforce thresholds
+    python bench_gex.py --sizes 50 1000 --repeat 5
+    python bench_gex.py --write-thresholds --headroom 3  # recalibrate on this machine
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from greeks import contract_arrays
+from gex_pipeline import (LEVEL_BAND, add_exposures, chain_sides, compute_gex, find_key_levels, matrix_view,
+                          range_slice, strike_table)
+from synthetic_chain import synthetic_chain
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [50, 200, 1000, 5000, 20000]
+DEFAULT_RESULTS = os.path.join(HERE, 'bench_results.json')
+DEFAULT_THRESHOLDS = os.path.join(HERE, 'bench_thresholds.json')
+SPOT = 500.0
+DAYS = 7      # synthetic_chain's default expiry
+
+
+def _stages(calls, puts, gex_df):
+    contracts = contract_arrays(calls, puts, DAYS / 365)
+    return {
+        'compute_gex': lambda: compute_gex(calls, puts, SPOT),
+        'add_exposures': lambda: add_exposures(gex_df, contracts, SPOT),
+        'find_key_levels': lambda: find_key_levels(gex_df, SPOT),
+        'strike_table': lambda: matrix_view(range_slice(strike_table(gex_df, calls, puts),
+                                                        SPOT * (1 - LEVEL_BAND), SPOT * (1 + LEVEL_BAND))),
+    }
+
+
+def measure(fn, repeat):
+    """Median and best wall time over ``repeat`` calls (after one warm-up), plus peak traced memory of one call"""
+    fn()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'median_ms': round(float(np.median(times)) * 1000, 3), 'min_ms': round(min(times) * 1000, 3),
+            'peak_kb': round(peak / 1024, 1)}
+
+
+def run(sizes, repeat, seed=0):
+    rows = []
+    for n in sizes:
+        calls, puts = chain_sides(synthetic_chain(n, seed=seed, spot=SPOT))
+        gex_df = compute_gex(calls, puts, SPOT)
+        for stage, fn in _stages(calls, puts, gex_df).items():
+            rows.append({'stage': stage, 'strikes': n, 'contracts': len(calls) + len(puts), **measure(fn, repeat)})
+            print(f"{stage:<16}{n:>7} strikes  median {rows[-1]['median_ms']:>9.3f} ms  "
+                  f"peak {rows[-1]['peak_kb']:>9.1f} KB", file=sys.stderr)
+    return rows
+
+
+def check(rows, thresholds):
+    """Rows over their threshold as readable failures"""
+    failures = []
+    for row in rows:
+        limit = thresholds.get(row['stage'], {}).get(str(row['strikes']))
+        if limit is None:
+            continue
+        for metric in ('median_ms', 'peak_kb'):
+            if metric in limit and row[metric] > limit[metric]:
+                failures.append(f"{row['stage']} @ {row['strikes']} strikes: {metric} {row[metric]} > {limit[metric]}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark compute_gex / add_exposures / find_key_levels / strike_table")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Strikes per side")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed calls per stage and size")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=DEFAULT_RESULTS, help="Results JSON (default bench_results.json)")
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--check', action='store_true', help="Exit 1 if any result is over its threshold")
+    parser.add_argument('--write-thresholds', action='store_true',
+                        help="Write thresholds from this run times --headroom")
+    parser.add_argument('--headroom', type=float, default=3.0)
+    args = parser.parse_args(argv)
+
+    rows = run(args.sizes, args.repeat, args.seed)
+    report = {
+        'meta': {
+            'timestamp': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': rows,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Wrote {len(rows)} results to {args.out}", file=sys.stderr)
+
+    if args.write_thresholds:
+        thresholds = {}
+        for row in rows:
+            thresholds.setdefault(row['stage'], {})[str(row['strikes'])] = {
+                'median_ms': round(row['median_ms'] * args.headroom, 2),
+                'peak_kb': round(row['peak_kb'] * args.headroom, 1),
+            }
+        with open(args.thresholds, 'w') as f:
+            json.dump(thresholds, f, indent=2)
+            f.write('\n')
+        print(f"✓ Wrote thresholds ({args.headroom}x headroom) to {args.thresholds}", file=sys.stderr)
+
+    if args.check:
+        with open(args.thresholds) as f:
+            failures = check(rows, json.load(f))
+        for failure in failures:
+            print(f"ERROR: {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print("✓ All results within thresholds", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
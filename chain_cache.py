@@ -0,0 +1,129 @@
+import time
+import threading
+from concurrent.futures import Future
+
+from gex_pipeline import chain_sides
+
+
+class _Snapshot:
+    """One fetched chain, never modified after it is stored"""
+
+    def __init__(self, result, log, version):
+        self.result = result
+        self.log = log
+        self.version = version
+        self.fetched_at = time.monotonic()
+
+
+def snapshot_view(result, stale_age=None):
+    """
+    Per-caller handle on a shared chain result without copying any data.
+
+    The dict and frames are fresh shallow objects over the shared buffers, and
+    copy-on-write (always on since pandas 3, hence the requirements pin) means
+    a caller that edits its frame copies first, so the cached snapshot never
+    changes under other sessions. A view served because
+    the upstream is failing carries ``stale_age`` (seconds).
+    """
+    if result is None:
+        return None
+    view = dict(result)
+    if stale_age is not None:
+        view['stale_age'] = stale_age
+    view['raw_df'] = result['raw_df'].copy(deep=False)
+    view['calls'], view['puts'] = chain_sides(view['raw_df'])
+    return view
+
+
+class ChainCache:
+    """
+    Process-wide store of the latest chain per (ticker, expiry offset).
+
+    Replaces pickling the chain into st.cache_data: entries are held once and
+    handed out by reference through snapshot_view, so a cache hit costs no
+    deserialization. Entries older than ``ttl`` seconds are refetched; every
+    stored snapshot gets a new process-wide ``version`` so downstream state can
+    tell a refetched chain from one it has already seen.
+    ``fetch(ticker, expiry_offset)`` must return ``(result or None, log)``;
+    failed fetches are not cached. Concurrent requests for a key that is
+    already being fetched wait for that fetch instead of starting another.
+    When a refetch fails, the last good snapshot (up to ``max_stale`` seconds
+    old) is served instead, marked stale.
+    """
+
+    def __init__(self, fetch, ttl=300, max_stale=3600):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.hits = 0
+        self.misses = 0
+        self.joins = 0
+        self.stale_served = 0
+        self._entries = {}
+        self._inflight = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def get(self, ticker, expiry_offset, force=False):
+        """(result view or None, log, version or None), fetching when missing, expired or forced"""
+        key = (ticker, expiry_offset)
+        with self._lock:
+            snap = self._entries.get(key)
+            if not force and snap is not None and time.monotonic() - snap.fetched_at < self.ttl:
+                self.hits += 1
+                return snapshot_view(snap.result), snap.log + [f"✓ Shared snapshot v{snap.version}"], snap.version
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = Future()
+                self.misses += 1
+            else:
+                self.joins += 1
+
+        if not leader:
+            result, log, version, stale_age = pending.result()
+            return snapshot_view(result, stale_age), log + ["✓ Joined in-flight fetch"], version
+
+        version, stale_age = None, None
+        try:
+            result, log = self.fetch(ticker, expiry_offset)
+            if result is not None:
+                version = self.put(ticker, expiry_offset, result, log).version
+        except Exception as e:
+            result, log = None, [f"ERROR: {str(e)}"]
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if result is None and snap is not None and time.monotonic() - snap.fetched_at < self.max_stale:
+                    self.stale_served += 1
+                    stale_age = time.monotonic() - snap.fetched_at
+                    result, version = snap.result, snap.version
+                    log = log + [f"⚠ Upstream failing, serving last good snapshot v{snap.version} "
+                                 f"({stale_age:.0f}s old)"]
+        pending.set_result((result, log, version, stale_age))
+        return snapshot_view(result, stale_age), log, version
+
+    def refresh(self, ticker, expiry_offset):
+        """Refetch one key now, or join its fetch if one is already running"""
+        return self.get(ticker, expiry_offset, force=True)
+
+    def put(self, ticker, expiry_offset, result, log):
+        """Store a freshly fetched chain as the current snapshot for its key"""
+        now = time.monotonic()
+        with self._lock:
+            self._version += 1
+            snap = _Snapshot(result, log, self._version)
+            # Expired snapshots stay as stale fallbacks until max_stale, then stop pinning memory
+            for key in [k for k, s in self._entries.items() if now - s.fetched_at >= self.max_stale]:
+                del self._entries[key]
+            self._entries[(ticker, expiry_offset)] = snap
+        return snap
+
+    def stats(self):
+        """Entry count, hit/miss counters and per-key version and age"""
+        now = time.monotonic()
+        with self._lock:
+            rows = [{'ticker': t, 'expiry_offset': o, 'version': s.version, 'age_s': round(now - s.fetched_at, 1)}
+                    for (t, o), s in self._entries.items()]
+            return {'entries': len(rows), 'hits': self.hits, 'misses': self.misses, 'joins': self.joins,
+                    'stale_served': self.stale_served, 'in_flight': len(self._inflight), 'snapshots': rows}
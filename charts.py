@@ -0,0 +1,395 @@
+"""
+Plotly figures for the dashboard tabs.
+
+Pure functions of a GEX table, spot and key levels, so app.py can build them
+once per snapshot and range and reuse them across reruns and sessions. Wide
+strike ranges are decimated server-side: bar charts sum adjacent strikes into
+at most MAX_BARS buckets (totals are unchanged) and line charts switch to
+WebGL traces past WEBGL_POINTS points.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+MAX_BARS = 400        # Bars per chart before adjacent strikes are bucketed
+WEBGL_POINTS = 1000   # Line points per trace before switching to Scattergl
+
+BG = '#0a0e1a'
+GRID = '#1a2332'
+FONT = dict(color='#8b9dc3', family='Courier New')
+LEGEND = dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#8b9dc3'))
+MARGIN = dict(l=60, r=20, t=20, b=40)
+SUM_COLUMNS = ['call_gex', 'put_gex', 'net_gex', 'call_oi', 'put_oi', 'call_vol', 'put_vol', 'net_dex',
+               'vanna_ex', 'charm_ex', 'vomma_ex']
+
+
+# ─── DECIMATION ────────────────────────────────────────────────
+
+def decimate(gex_df, max_bars=MAX_BARS):
+    """
+    Strike-sorted GEX table with at most ``max_bars`` rows.
+
+    Adjacent strikes are merged into equal-count buckets: additive columns
+    are summed and the strike becomes the bucket's mean, so bar heights
+    still add up to the same totals. Smaller tables come back unchanged.
+    """
+    n = len(gex_df)
+    if n <= max_bars:
+        return gex_df
+    starts = np.unique(np.linspace(0, n, max_bars, endpoint=False).astype(np.intp))
+    counts = np.diff(np.append(starts, n))
+    out = {'strike': np.add.reduceat(gex_df['strike'].to_numpy(dtype=float), starts) / counts}
+    for col in SUM_COLUMNS:
+        if col in gex_df.columns:
+            out[col] = np.add.reduceat(gex_df[col].to_numpy(dtype=float), starts)
+    return pd.DataFrame(out)
+
+
+def _scatter(n_points, **kwargs):
+    """Scatter trace, WebGL-backed once it carries more than WEBGL_POINTS points"""
+    return (go.Scattergl if n_points > WEBGL_POINTS else go.Scatter)(**kwargs)
+
+
+# ─── FIGURES ───────────────────────────────────────────────────
+
+def gex_profile_figure(bars, spot, levels, title):
+    """Horizontal call/put GEX bars with spot, magnet and flip lines"""
+    fig = go.Figure()
+
+    # Put GEX bars (blue, going right)
+    fig.add_trace(go.Bar(
+        y=bars['strike'],
+        x=bars['put_gex'],
+        orientation='h',
+        name='Put GEX',
+        marker=dict(
+            color='rgba(100, 180, 255, 0.75)',
+            line=dict(color='rgba(70, 150, 255, 1)', width=0.5)
+        ),
+        hovertemplate='Strike: $%{y:.0f}<br>Put GEX: %{x:,.0f}<extra></extra>'
+    ))
+
+    # Call GEX bars (orange, going left — negative for visual)
+    fig.add_trace(go.Bar(
+        y=bars['strike'],
+        x=-bars['call_gex'],
+        orientation='h',
+        name='Call GEX',
+        marker=dict(
+            color='rgba(255, 180, 50, 0.75)',
+            line=dict(color='rgba(255, 150, 20, 1)', width=0.5)
+        ),
+        hovertemplate='Strike: $%{y:.0f}<br>Call GEX: %{x:,.0f}<extra></extra>'
+    ))
+
+    # Spot price line
+    fig.add_hline(
+        y=spot, line_dash="solid", line_color="#ffd700", line_width=3,
+        annotation=dict(
+            text=f"SPOT ${spot:.2f}",
+            font=dict(size=11, color="#ffd700", family="Courier New"),
+            bgcolor="rgba(0,0,0,0.8)", bordercolor="#ffd700", borderwidth=1
+        ),
+        annotation_position="right"
+    )
+
+    # Key level lines
+    if levels.get('magnet'):
+        fig.add_hline(y=levels['magnet'], line_dash="dot", line_color="#00ff88", line_width=1.5,
+                     annotation=dict(text=f"🧲 MAGNET ${levels['magnet']:.0f}",
+                                    font=dict(size=9, color="#00ff88"), x=0.02))
+    if levels.get('flip'):
+        fig.add_hline(y=levels['flip'], line_dash="dash", line_color="#ffd700", line_width=1.5,
+                     annotation=dict(text=f"⚖ FLIP ${levels['flip']:.0f}",
+                                    font=dict(size=9, color="#ffd700"), x=0.02))
+
+    fig.update_layout(
+        barmode='overlay',
+        height=700,
+        plot_bgcolor=BG,
+        paper_bgcolor=BG,
+        font=dict(color='#8b9dc3', size=10, family='Courier New'),
+        title=dict(
+            text=title,
+            font=dict(color='#00d4ff', size=14),
+            x=0.5
+        ),
+        xaxis=dict(title="← Calls | Puts →", gridcolor=GRID,
+                   zerolinecolor='#2a3442', tickformat=','),
+        yaxis=dict(title="", gridcolor=GRID, tickformat='$.0f', side='left'),
+        showlegend=True,
+        legend=dict(bgcolor='rgba(0,0,0,0)', font=dict(color='#8b9dc3', size=10)),
+        margin=dict(l=60, r=20, t=40, b=40)
+    )
+    return fig
+
+
+def net_gex_figure(bars, spot):
+    """Net GEX per strike, green above zero and red below"""
+    fig = go.Figure()
+    values = bars['net_gex'].to_numpy()
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=values,
+        marker_color=np.where(values > 0, '#00ff88', '#ff4466'), name='Net GEX',
+        hovertemplate='$%{x:.0f}<br>Net GEX: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2,
+                  annotation=dict(text=f"${spot:.2f}", font=dict(color="#ffd700", size=10)))
+
+    fig.update_layout(
+        height=350, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=dict(color='#8b9dc3', size=10, family='Courier New'),
+        xaxis=dict(title="Strike", gridcolor=GRID, tickformat='$.0f'),
+        yaxis=dict(title="Net GEX", gridcolor=GRID, tickformat=','),
+        margin=MARGIN
+    )
+    return fig
+
+
+def term_heatmap_figure(term_net, spot):
+    """Net GEX by strike × expiry"""
+    zmax = float(np.abs(term_net.to_numpy()).max()) if not term_net.empty else 1.0
+
+    fig = go.Figure(go.Heatmap(
+        z=term_net.to_numpy(), x=list(term_net.columns), y=term_net.index,
+        colorscale='RdYlGn', zmid=0, zmin=-zmax, zmax=zmax,
+        hovertemplate='$%{y:.0f} • %{x}<br>Net GEX: %{z:,.0f}<extra></extra>'
+    ))
+    fig.add_hline(y=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+    fig.update_layout(
+        height=500, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=dict(color='#8b9dc3', size=10, family='Courier New'),
+        xaxis=dict(title="Expiry", type='category'),
+        yaxis=dict(title="Strike", gridcolor=GRID, tickformat='$.0f'),
+        margin=MARGIN
+    )
+    return fig
+
+
+def oi_figure(bars, spot):
+    """Call OI up, put OI down"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=bars['call_oi'],
+        name='Call OI', marker_color='rgba(255,180,50,0.7)',
+        hovertemplate='$%{x:.0f}<br>Call OI: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=-bars['put_oi'],
+        name='Put OI', marker_color='rgba(100,180,255,0.7)',
+        hovertemplate='$%{x:.0f}<br>Put OI: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+    fig.update_layout(barmode='overlay', height=500, **_profile_layout())
+    return fig
+
+
+def volume_figure(bars, spot):
+    """Call volume up, put volume down"""
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=bars['call_vol'],
+        name='Call Vol', marker_color='rgba(255,180,50,0.7)',
+    ))
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=-bars['put_vol'],
+        name='Put Vol', marker_color='rgba(100,180,255,0.7)',
+    ))
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+    fig.update_layout(barmode='overlay', height=500, **_profile_layout())
+    return fig
+
+
+def _profile_layout():
+    return dict(
+        plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(gridcolor=GRID, tickformat='$.0f'),
+        yaxis=dict(gridcolor=GRID, tickformat=','),
+        legend=LEGEND,
+        margin=MARGIN
+    )
+
+
+def gamma_profile_figure(gamma_grid, gamma_curve, spot, zero_gamma_level):
+    """Dealer GEX across hypothetical spots, with the zero-gamma crossing"""
+    fig = go.Figure()
+    fig.add_trace(_scatter(
+        len(gamma_grid), x=gamma_grid, y=gamma_curve, mode='lines', name='Dealer GEX',
+        line=dict(color='#00d4ff', width=2), fill='tozeroy', fillcolor='rgba(0,212,255,0.08)',
+        hovertemplate='Spot $%{x:.2f}<br>GEX: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_hline(y=0, line_color="#2a3442", line_width=1)
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+    if zero_gamma_level:
+        fig.add_vline(x=zero_gamma_level, line_dash="dot", line_color="#ff4466", line_width=1.5,
+                      annotation=dict(text=f"ZERO Γ ${zero_gamma_level:.2f}",
+                                      font=dict(size=10, color="#ff4466")))
+
+    fig.update_layout(
+        height=400, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(title="Hypothetical Spot", gridcolor=GRID, tickformat='$.0f'),
+        yaxis=dict(title="Dealer GEX", gridcolor=GRID, tickformat=','),
+        showlegend=False,
+        margin=MARGIN
+    )
+    return fig
+
+
+def delta_figure(bars, spot):
+    """Net dealer delta exposure per strike"""
+    fig = go.Figure()
+    values = bars['net_dex'].to_numpy()
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=values,
+        marker_color=np.where(values > 0, '#00ff88', '#ff4466'), name='Net Delta',
+        hovertemplate='$%{x:.0f}<br>Net Δ: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+
+    fig.update_layout(
+        height=500, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(title="Strike", gridcolor=GRID, tickformat='$.0f'),
+        yaxis=dict(title="Net Delta Exposure", gridcolor=GRID, tickformat=','),
+        margin=MARGIN
+    )
+    return fig
+
+
+def exposure_figure(bars, column, spot, y_title, height=400):
+    """Signed per-strike bars of one higher-order exposure column"""
+    fig = go.Figure()
+    values = bars[column].to_numpy()
+    fig.add_trace(go.Bar(
+        x=bars['strike'], y=values,
+        marker_color=np.where(values > 0, '#00ff88', '#ff4466'), name=y_title,
+        hovertemplate=f'$%{{x:.0f}}<br>{y_title}: %{{y:,.0f}}<extra></extra>'
+    ))
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+
+    fig.update_layout(
+        height=height, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(title="Strike", gridcolor=GRID, tickformat='$.0f'),
+        yaxis=dict(title=y_title, gridcolor=GRID, tickformat=','),
+        margin=MARGIN
+    )
+    return fig
+
+
+def exposure_path_figure(path):
+    """Total vanna and charm exposure from now into the close (exposure_into_close frame)"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=path['ts'], y=path['vanna_ex'], mode='lines+markers', name='Vanna ($Δ / vol pt)',
+        line=dict(color='#c77dff', width=2), marker=dict(size=4),
+        hovertemplate='%{x|%H:%M}<br>Vanna: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=path['ts'], y=path['charm_ex'], mode='lines+markers', name='Charm ($Δ / day)', yaxis='y2',
+        line=dict(color='#ffb832', width=2), marker=dict(size=4),
+        hovertemplate='%{x|%H:%M}<br>Charm: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_hline(y=0, line_color="#2a3442", line_width=1)
+
+    fig.update_layout(
+        height=400, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(gridcolor=GRID),
+        yaxis=dict(title="Vanna", gridcolor=GRID, tickformat=','),
+        yaxis2=dict(title="Charm", overlaying='y', side='right', showgrid=False, tickformat=','),
+        legend=LEGEND,
+        margin=dict(l=60, r=60, t=20, b=40)
+    )
+    return fig
+
+
+def iv_smile_figure(gex_df, spot):
+    """Call and put IV by strike"""
+    iv_data = gex_df[(gex_df['call_iv'] > 0) | (gex_df['put_iv'] > 0)]
+    fig = go.Figure()
+    fig.add_trace(_scatter(
+        len(iv_data), x=iv_data['strike'], y=iv_data['call_iv'],
+        mode='lines+markers', name='Call IV',
+        line=dict(color='#ffb832', width=2), marker=dict(size=4)
+    ))
+    fig.add_trace(_scatter(
+        len(iv_data), x=iv_data['strike'], y=iv_data['put_iv'],
+        mode='lines+markers', name='Put IV',
+        line=dict(color='#64b4ff', width=2), marker=dict(size=4)
+    ))
+    fig.add_vline(x=spot, line_dash="dash", line_color="#ffd700", line_width=2)
+
+    fig.update_layout(
+        height=400, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(title="Strike", gridcolor=GRID, tickformat='$.0f'),
+        yaxis=dict(title="IV (%)", gridcolor=GRID),
+        legend=LEGEND,
+        margin=MARGIN
+    )
+    return fig
+
+
+def session_figure(history):
+    """Spot and key levels through the session from a LevelHistory frame, net GEX bars underneath"""
+    n = len(history)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=history['ts'], y=history['net_gex'], name='Net GEX ±5%', yaxis='y2',
+        marker_color=np.where(history['net_gex'].to_numpy() > 0, 'rgba(0,255,136,0.25)', 'rgba(255,68,102,0.25)'),
+        hovertemplate='%{x|%H:%M}<br>Net GEX: %{y:,.0f}<extra></extra>'
+    ))
+    for col, name, color, dash in [('call_wall', 'Call Wall', '#ff4466', 'dot'), ('put_wall', 'Put Wall', '#00d4ff', 'dot'),
+                                   ('magnet', 'Magnet', '#00ff88', 'dot'), ('flip', 'Flip', '#ffd700', 'dash')]:
+        fig.add_trace(_scatter(
+            n, x=history['ts'], y=history[col], mode='lines', name=name, line_shape='hv',
+            line=dict(color=color, width=1.5, dash=dash),
+            hovertemplate=f'%{{x|%H:%M}}<br>{name}: $%{{y:.0f}}<extra></extra>'
+        ))
+    fig.add_trace(_scatter(
+        n, x=history['ts'], y=history['spot'], mode='lines+markers', name='Spot',
+        line=dict(color='#ffffff', width=2),
+        marker=dict(size=5, color=np.where(history['regime'].to_numpy() > 0, '#00ff88', '#ff4466')),
+        hovertemplate='%{x|%H:%M}<br>Spot: $%{y:.2f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        height=450, plot_bgcolor=BG, paper_bgcolor=BG,
+        font=FONT,
+        xaxis=dict(gridcolor=GRID),
+        yaxis=dict(title="Price", gridcolor=GRID, tickformat='$.0f'),
+        yaxis2=dict(title="Net GEX", overlaying='y', side='right', showgrid=False, tickformat=','),
+        legend=LEGEND,
+        margin=dict(l=60, r=60, t=20, b=40)
+    )
+    return fig
+
+
+def dashboard_figures(gex_filtered, spot, levels, title, gamma_grid, gamma_curve, zero_gamma_level, term_net=None,
+                      history=None, exposure_path=None):
+    """Every tab figure for one GEX view, keyed by name; 'bucketed' is the strikes-per-bar factor (1 = none)"""
+    bars = decimate(gex_filtered)
+    figures = {
+        'gex_profile': gex_profile_figure(bars, spot, levels, title),
+        'net_gex': net_gex_figure(bars, spot),
+        'oi': oi_figure(bars, spot),
+        'volume': volume_figure(bars, spot),
+        'gamma_profile': gamma_profile_figure(gamma_grid, gamma_curve, spot, zero_gamma_level),
+        'delta': delta_figure(bars, spot),
+        'iv_smile': iv_smile_figure(gex_filtered, spot),
+        'vanna': exposure_figure(bars, 'vanna_ex', spot, 'Vanna Exposure ($Δ / vol pt)'),
+        'charm': exposure_figure(bars, 'charm_ex', spot, 'Charm Exposure ($Δ / day)'),
+        'vomma': exposure_figure(bars, 'vomma_ex', spot, 'Vomma Exposure ($vega / vol pt)', height=350),
+        'bucketed': len(gex_filtered) / max(len(bars), 1),
+    }
+    if term_net is not None:
+        figures['term'] = term_heatmap_figure(term_net, spot)
+    if exposure_path is not None and len(exposure_path):
+        figures['exposure_path'] = exposure_path_figure(exposure_path)
+    if history is not None and len(history):
+        figures['session'] = session_figure(history)
+    return figures
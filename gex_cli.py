@@ -0,0 +1,86 @@
+"""
+Command-line GEX runner.
+
+    python gex_cli.py SPY QQQ --expiries 0 1 --format json
+    python gex_cli.py SPX --format parquet --out ./gex_out
+    python gex_cli.py SPY --spans spans.jsonl
+
+JSON prints one summary per (ticker, expiry) to stdout (or --out). Parquet
+writes each strike table plus a levels.parquet summary into the --out directory.
+"""
+import os
+import sys
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from gex_pipeline import LEVEL_BAND, MAX_FETCH_WORKERS, run_pipeline
+from telemetry import RECORDER
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch option chains and compute GEX and key levels")
+    parser.add_argument('tickers', nargs='+', help="Underlyings, e.g. SPY QQQ SPX")
+    parser.add_argument('--expiries', type=int, nargs='+', default=[0],
+                        help="Expiry offsets (0 = nearest), default 0")
+    parser.add_argument('--range', type=float, default=LEVEL_BAND * 100, dest='range_pct',
+                        help="Strike range around spot for totals, in percent (default 5)")
+    parser.add_argument('--mult', type=int, default=100, help="Contract multiplier (default 100)")
+    parser.add_argument('--format', choices=['json', 'parquet'], default='json')
+    parser.add_argument('--out', help="JSON file, or output directory for parquet")
+    parser.add_argument('--no-archive', action='store_true', help="Don't append fetched chains to the archive")
+    parser.add_argument('--workers', type=int, default=MAX_FETCH_WORKERS, help="Concurrent fetches")
+    parser.add_argument('--verbose', action='store_true', help="Print fetch logs to stderr")
+    parser.add_argument('--spans', help="Write per-stage timing spans here (.jsonl, or .prom for Prometheus text)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.format == 'parquet' and not args.out:
+        print("ERROR: --format parquet needs --out <directory>", file=sys.stderr)
+        return 2
+
+    keys = [(t.upper(), e) for t in args.tickers for e in args.expiries]
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(keys)))) as pool:
+        runs = list(pool.map(lambda k: run_pipeline(k[0], k[1], args.range_pct / 100, args.mult,
+                                                    archive=not args.no_archive), keys))
+
+    rows, failed = [], 0
+    for run in runs:
+        if args.verbose or run['summary'] is None:
+            for line in run['log']:
+                print(f"[{run['ticker']} +{run['expiry_offset']}] {line}", file=sys.stderr)
+        if run['summary'] is None:
+            failed += 1
+            continue
+        rows.append({'ticker': run['ticker'], 'expiry_offset': run['expiry_offset'], **run['summary'],
+                     'elapsed_s': round(run['elapsed_s'], 3)})
+
+    if args.format == 'json':
+        text = json.dumps(rows, indent=2, default=str)
+        if args.out:
+            with open(args.out, 'w') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        for run in runs:
+            if run['gex_df'] is not None:
+                name = f"{run['ticker']}_{run['summary']['expiry']}_gex.parquet"
+                run['gex_df'].to_parquet(os.path.join(args.out, name), index=False)
+        pd.DataFrame(rows).to_parquet(os.path.join(args.out, 'levels.parquet'), index=False)
+        print(f"✓ Wrote {len(rows)} GEX tables to {args.out}", file=sys.stderr)
+
+    if args.spans:
+        with open(args.spans, 'w') as f:
+            f.write(RECORDER.to_prometheus() if args.spans.endswith('.prom') else RECORDER.to_jsonl())
+    
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,613 @@
+"""
+Headless GEX pipeline: fetch -> compute_gex -> find_key_levels.
+
+Nothing here imports Streamlit, so cron jobs, other services and gex_cli.py
+run exactly the code the dashboard runs.
+"""
+import time
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from greeks import (MARKET_CLOSE, MARKET_TZ, MIN_T, bs_exposures, contract_arrays, gamma_profile,
+                    time_to_expiry, zero_gamma)
+from telemetry import span
+
+
+# ─── SHARED CLIENTS ────────────────────────────────────────────
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _shared(name, factory):
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = factory()
+        return _clients[name]
+
+
+def barchart_session():
+    """Process-wide Barchart session shared by every caller, ticker and user"""
+    from barchart_client import BarchartSession
+    return _shared('barchart', BarchartSession)
+
+
+def snapshot_store():
+    """Append-only on-disk archive of every chain we fetch"""
+    from snapshot_store import SnapshotStore
+    return _shared('archive', SnapshotStore)
+
+
+# ─── FETCH ─────────────────────────────────────────────────────
+EXPIRY_TTL = 6 * 3600  # Listed expiries change about once a day
+CHAIN_FIELDS = 'symbol,strikePrice,lastPrice,volatility,delta,gamma,theta,vega,volume,openInterest,optionType'
+SPOT_FIELD = 'baseLastPrice'  # Underlying last price, carried on every option row
+
+# Compact in-memory chain: float32 greeks, int32 counts, categorical side.
+# Strikes stay float64 so they key exactly like the archive and the GEX tables.
+CHAIN_DTYPES = {
+    'strikePrice': 'float64', 'lastPrice': 'float32', 'volatility': 'float32', 'delta': 'float32',
+    'gamma': 'float32', 'theta': 'float32', 'vega': 'float32', 'volume': 'int32', 'openInterest': 'int32',
+}
+OPTION_TYPES = pd.CategoricalDtype(['Call', 'Put'])
+
+_calendars = {}
+_calendars_lock = threading.Lock()
+_snapshot_ids = itertools.count(1)  # Process-unique id per fetched chain, for caching what is derived from it
+
+
+def expiry_calendar(ticker_symbol, error_log):
+    """Listed expiry dates, from yfinance at most once per EXPIRY_TTL and New York trading day"""
+    today = pd.Timestamp.now(tz=MARKET_TZ).strftime('%Y-%m-%d')
+    with _calendars_lock:
+        cached = _calendars.get(ticker_symbol)
+    if cached is not None and cached['day'] == today and time.monotonic() - cached['at'] < EXPIRY_TTL:
+        error_log.append("✓ Expiry calendar cached")
+        return cached['dates']
+    
+    import yfinance as yf
+    from upstream import guard
+    
+    # Expired dates can linger in yfinance's list until its own cache rolls
+    with span('yfinance.options', ticker=ticker_symbol) as s:
+        options = guard('yfinance').call(lambda: yf.Ticker(ticker_symbol).options, error_log)
+        s['items'] = len(options)
+    dates = [d for d in options if d >= today]
+    if dates:
+        with _calendars_lock:
+            _calendars[ticker_symbol] = {'day': today, 'at': time.monotonic(), 'dates': dates}
+    return dates
+
+
+def _payload_spot(data):
+    """Underlying price from the first option row that carries one, else None"""
+    for options in data.get('data', {}).values():
+        for option in options:
+            value = option.get('raw', {}).get(SPOT_FIELD, option.get(SPOT_FIELD))
+            try:
+                value = float(str(value).replace(',', ''))
+            except ValueError:
+                continue
+            if value > 0:
+                return value
+    return None
+
+
+def _quote_spot(ticker_symbol, error_log):
+    """Fallback spot: last close from yfinance"""
+    import yfinance as yf
+    from upstream import guard
+    
+    with span('yfinance.history', ticker=ticker_symbol):
+        hist = guard('yfinance').call(lambda: yf.Ticker(ticker_symbol).history(period="5d"), error_log)
+    return None if hist.empty else float(hist['Close'].iloc[-1])
+
+
+def compact_chain(df):
+    """Cast a raw chain to CHAIN_DTYPES and order it calls first, then puts"""
+    for col, dtype in CHAIN_DTYPES.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(dtype)
+    if 'symbol' in df.columns:
+        df['symbol'] = df['symbol'].astype(str)
+    df['optionType'] = df['optionType'].astype(OPTION_TYPES)
+    df = df[df['optionType'].notna()]
+    return df.sort_values('optionType', kind='stable').reset_index(drop=True)
+
+
+def _coerce(values):
+    """Payload values (numbers, numeric strings, '1,234', 'N/A', None) as float64, unparseable ones NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        text = pd.Series(values, dtype=object).astype(str).str.replace(',', '', regex=False)
+        return pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def parse_options(data):
+    """
+    Compact chain table straight from an options/get payload grouped by optionType.
+
+    Each CHAIN_DTYPES column is preallocated once and filled a side at a time,
+    so rows land already partitioned calls first, then puts, with no per-option
+    dicts or intermediate object frame. Same table as compact_chain would give.
+    """
+    groups = data.get('data', {})
+    sides = [(code, groups.get(option_type) or []) for code, option_type in enumerate(OPTION_TYPES.categories)]
+    total = sum(len(options) for _, options in sides)
+    columns = {col: np.zeros(total, dtype=dtype) for col, dtype in CHAIN_DTYPES.items()}
+    symbols = np.empty(total, dtype=object)
+    codes = np.empty(total, dtype=np.int8)
+
+    start = 0
+    for code, options in sides:
+        stop = start + len(options)
+        symbols[start:stop] = [option.get('symbol') for option in options]
+        codes[start:stop] = code
+        for col, values in columns.items():
+            values[start:stop] = np.nan_to_num(_coerce([option.get(col) for option in options]), nan=0.0)
+        start = stop
+
+    return pd.DataFrame({
+        'symbol': pd.Series(symbols).astype(str),
+        **columns,
+        'optionType': pd.Categorical.from_codes(codes, dtype=OPTION_TYPES),
+    })
+
+
+def chain_sides(df):
+    """
+    Calls and puts of a compact_chain table as row slices over its buffers.
+
+    Nothing is copied up front; pandas 3 copy-on-write copies a slice the
+    first time anyone writes to it, so the parent table never changes.
+    """
+    n_calls = int(np.searchsorted(df['optionType'].cat.codes.to_numpy(), 1))
+    return df.iloc[:n_calls], df.iloc[n_calls:]
+
+
+def fetch_chain(ticker_symbol, expiry_offset=0, archive=True):
+    """Fetch options chain with Greeks from Barchart (uncached)"""
+    error_log = []
+    
+    try:
+        from barchart_client import base_symbol  # requests only loads on code paths that fetch
+        
+        expiry_dates = expiry_calendar(ticker_symbol, error_log)
+        
+        if not expiry_dates:
+            error_log.append("ERROR: No expiry dates found")
+            return None, error_log
+        
+        expiry_offset = min(expiry_offset, len(expiry_dates) - 1)
+        next_expiry_date = expiry_dates[expiry_offset]
+        error_log.append(f"✓ Selected expiry: {next_expiry_date}")
+        
+        # Fetch options chain over the shared Barchart session
+        payload = {
+            'baseSymbol': base_symbol(ticker_symbol),
+            'groupBy': 'optionType',
+            'expirationDate': next_expiry_date,
+            'orderBy': 'strikePrice',
+            'orderDir': 'asc',
+            'raw': '1',
+            'fields': f'{CHAIN_FIELDS},{SPOT_FIELD}'
+        }
+        
+        r = barchart_session().get_options(ticker_symbol, payload, error_log)
+        with span('parse.json', ticker=ticker_symbol, bytes=len(r.content)):
+            data = r.json()
+        error_log.append(f"✓ API response received")
+        
+        # Spot rides along in the chain payload; only go back to yfinance if it didn't
+        spot = _payload_spot(data)
+        if spot is None:
+            error_log.append("⚠ No underlying price in payload, using yfinance close")
+            spot = _quote_spot(ticker_symbol, error_log)
+            if spot is None:
+                error_log.append("ERROR: No price history")
+                return None, error_log
+        error_log.append(f"✓ Spot price: ${spot:.2f}")
+        
+        with span('build.dataframe', ticker=ticker_symbol) as s:
+            df = parse_options(data)
+            if df.empty:
+                error_log.append("ERROR: No options data returned")
+                return None, error_log
+            calls, puts = chain_sides(df)
+            s['rows'] = len(df)
+        
+        error_log.append(f"✓ Calls: {len(calls)}, Puts: {len(puts)}")
+        
+        # Archive the snapshot; a failed write must never cost us the live data
+        if archive:
+            try:
+                snapshot_store().append(ticker_symbol, next_expiry_date, df, spot)
+                error_log.append("✓ Snapshot archived")
+            except Exception as e:
+                error_log.append(f"⚠ Snapshot archive failed: {str(e)}")
+        
+        return {
+            'snapshot_id': next(_snapshot_ids),
+            'spot': spot,
+            'expiry': next_expiry_date,
+            'expiry_dates': expiry_dates,
+            'calls': calls,
+            'puts': puts,
+            'raw_df': df
+        }, error_log
+        
+    except Exception as e:
+        error_log.append(f"ERROR: {str(e)}")
+        return None, error_log
+
+
+# ─── GEX ───────────────────────────────────────────────────────
+
+GEX_FIELDS = ['openInterest', 'gamma', 'delta', 'volume', 'volatility']
+
+
+def _first_per_strike(side):
+    """Row positions of the first row per positive strike, ordered by strike"""
+    strikes = side['strikePrice'].to_numpy(dtype=float)
+    _, first = np.unique(strikes, return_index=True)
+    return first[strikes[first] > 0]
+
+
+def _side_by_strike(side):
+    """One side of the chain as (sorted strikes, GEX_FIELDS matrix)"""
+    first = _first_per_strike(side)
+    return side['strikePrice'].to_numpy(dtype=float)[first], side[GEX_FIELDS].to_numpy(dtype=float)[first]
+
+
+def compute_gex(calls, puts, spot, contract_mult=100):
+    """Compute Gamma Exposure by strike"""
+    with span('compute_gex', rows=len(calls) + len(puts)):
+        return _gex_frame(*_side_by_strike(calls), *_side_by_strike(puts), spot, contract_mult)
+
+
+def _gex_frame(call_k, call_v, put_k, put_v, spot, contract_mult=100):
+    """GEX table from already-extracted (strikes, GEX_FIELDS matrix) sides"""
+    # Align calls and puts on the union of strikes in one pass, missing side = 0
+    strike = np.union1d(call_k, put_k)
+    call = np.zeros((len(strike), len(GEX_FIELDS)))
+    put = np.zeros((len(strike), len(GEX_FIELDS)))
+    call[np.searchsorted(strike, call_k)] = call_v
+    put[np.searchsorted(strike, put_k)] = put_v
+    
+    call_oi, call_gamma, call_delta, call_vol, call_iv = call.T
+    put_oi, put_gamma, put_delta, put_vol, put_iv = put.T
+    call_oi, put_oi = call_oi.astype(np.int64), put_oi.astype(np.int64)
+    call_vol, put_vol = call_vol.astype(np.int64), put_vol.astype(np.int64)
+    
+    # GEX = gamma * OI * 100 * spot
+    # Calls positive, puts negative (MM hedging)
+    call_gex = call_gamma * call_oi * contract_mult * spot
+    put_gex = -put_gamma * put_oi * contract_mult * spot  # Negative for puts
+    
+    # Net delta exposure
+    call_dex = call_delta * call_oi * contract_mult
+    put_dex = put_delta * put_oi * contract_mult
+    
+    iv_sum = call_iv + put_iv
+    
+    return pd.DataFrame({
+        'strike': strike,
+        'call_gex': call_gex,
+        'put_gex': put_gex,
+        'net_gex': call_gex + put_gex,
+        'call_oi': call_oi,
+        'put_oi': put_oi,
+        'total_oi': call_oi + put_oi,
+        'call_vol': call_vol,
+        'put_vol': put_vol,
+        'total_vol': call_vol + put_vol,
+        'call_gamma': call_gamma,
+        'put_gamma': put_gamma,
+        'total_gamma': call_gamma * call_oi + put_gamma * put_oi,
+        'call_delta': call_delta,
+        'put_delta': put_delta,
+        'net_dex': call_dex + put_dex,
+        'call_iv': call_iv,
+        'put_iv': put_iv,
+        'avg_iv': np.where(iv_sum > 0, iv_sum / 2, 0.0),
+    })
+
+
+# ─── TERM STRUCTURE ────────────────────────────────────────────
+
+MAX_FETCH_WORKERS = 4   # Concurrent Barchart requests per term-structure fetch
+TERM_EXPIRIES = 6       # Expirations aggregated in term-structure mode
+
+# Per-contract columns are OI-weighted across expiries, everything else is summed
+TERM_WEIGHTED = {
+    'call_gamma': 'call_oi', 'call_delta': 'call_oi', 'call_iv': 'call_oi',
+    'put_gamma': 'put_oi', 'put_delta': 'put_oi', 'put_iv': 'put_oi',
+}
+
+
+def fetch_term_structure(ticker_symbol, n_expiries=TERM_EXPIRIES, max_workers=MAX_FETCH_WORKERS, fetch=None):
+    """Fetch the nearest n expirations concurrently; fetch(ticker, offset) -> (result, log), default fetch_chain"""
+    fetch = fetch or fetch_chain
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, n_expiries))) as pool:
+        results = list(pool.map(lambda i: fetch(ticker_symbol, i), range(n_expiries)))
+    
+    chains, error_log, seen = [], [], set()
+    for result, log in results:
+        error_log.extend(log)
+        # Offsets past the last listed expiry clamp to it, so drop repeats
+        if result is not None and result['expiry'] not in seen:
+            seen.add(result['expiry'])
+            chains.append(result)
+    error_log.append(f"✓ Term structure: {len(chains)}/{n_expiries} expiries")
+    return chains, error_log
+
+
+def compute_term_gex(chains, spot, contract_mult=100):
+    """Stack per-expiry GEX into a (strike, expiry) exposure cube"""
+    frames = [compute_gex(c['calls'], c['puts'], spot, contract_mult).assign(expiry=c['expiry'])
+              for c in chains]
+    return pd.concat(frames, ignore_index=True).set_index(['strike', 'expiry']).sort_index()
+
+
+def aggregate_term_gex(cube):
+    """Collapse the expiry axis of the cube into a gex_df-shaped profile"""
+    by_strike = cube.groupby(level='strike')
+    summed = [c for c in cube.columns if c not in TERM_WEIGHTED and c != 'avg_iv']
+    profile = by_strike[summed].sum()
+    
+    for col, weight in TERM_WEIGHTED.items():
+        w = cube[weight].groupby(level='strike').sum()
+        weighted = (cube[col] * cube[weight]).groupby(level='strike').sum() / w.where(w > 0)
+        profile[col] = weighted.fillna(by_strike[col].mean())
+    
+    iv_sum = profile['call_iv'] + profile['put_iv']
+    profile['avg_iv'] = np.where(iv_sum > 0, iv_sum / 2, 0.0)
+    return profile.reset_index()[['strike'] + list(cube.columns)]
+
+
+# ─── KEY LEVELS ────────────────────────────────────────────────
+
+LEVEL_COLUMNS = ['strike', 'net_gex', 'total_gamma', 'call_oi', 'put_oi']
+LEVEL_BAND = 0.05   # Levels are searched within ±5% of spot
+FLIP_BAND = 0.03    # A flip only counts if one side of it is within ±3% of spot
+
+
+def stack_gex(frames, columns=LEVEL_COLUMNS):
+    """Stack gex_df frames into (snapshot, strike) arrays, each row right-padded with NaN"""
+    width = max((len(f) for f in frames), default=0)
+    stacked = {col: np.full((len(frames), width), np.nan) for col in columns}
+    for i, frame in enumerate(frames):
+        for col in columns:
+            stacked[col][i, :len(frame)] = frame[col].to_numpy(dtype=float)
+    return stacked
+
+
+def _strike_at_max(strike, score, mask):
+    """Per row, the strike of the first max of score among mask (NaN if mask is empty)"""
+    mask = mask & ~np.isnan(score)
+    idx = np.where(mask, score, -np.inf).argmax(axis=1)
+    picked = np.take_along_axis(strike, idx[:, None], axis=1)[:, 0]
+    return np.where(mask.any(axis=1), picked, np.nan)
+
+
+def find_key_levels_batch(strike, net_gex, total_gamma, call_oi, put_oi, spot):
+    """
+    Key levels for many snapshots at once.
+    
+    Inputs are (snapshot, strike) arrays with strikes ascending per row and
+    NaN padding (see stack_gex), plus one spot per snapshot. Returns a dict
+    of per-snapshot arrays: strikes are NaN where a level doesn't exist and
+    gamma_regime is None when no strike lies near spot.
+    """
+    spot = np.asarray(spot, dtype=float)[:, None]
+    if strike.shape[1] < 2:
+        # Pad so the pairwise and arg-reductions below are always defined
+        pad = [(0, 0), (0, 2 - strike.shape[1])]
+        strike, net_gex, total_gamma, call_oi, put_oi = (
+            np.pad(np.asarray(x, dtype=float), pad, constant_values=np.nan)
+            for x in (strike, net_gex, total_gamma, call_oi, put_oi))
+    nearby = (strike >= spot * (1 - LEVEL_BAND)) & (strike <= spot * (1 + LEVEL_BAND))
+    
+    # Gamma Flip: first adjacent pair of nearby strikes where net_gex changes sign near spot
+    s1, s2 = strike[:, :-1], strike[:, 1:]
+    crosses = (nearby[:, :-1] & nearby[:, 1:] & (net_gex[:, :-1] * net_gex[:, 1:] < 0)
+               & ((np.abs(s1 - spot) < spot * FLIP_BAND) | (np.abs(s2 - spot) < spot * FLIP_BAND)))
+    first = crosses.argmax(axis=1)[:, None]
+    flip = np.where(crosses.any(axis=1),
+                    (np.take_along_axis(s1, first, axis=1) + np.take_along_axis(s2, first, axis=1))[:, 0] / 2,
+                    np.nan)
+    
+    # Walls only exist if some nearby strike has OI on that side
+    max_put = np.where(nearby, put_oi, -np.inf).max(axis=1, initial=-np.inf)
+    max_call = np.where(nearby, call_oi, -np.inf).max(axis=1, initial=-np.inf)
+    
+    # Regime from the strike nearest spot (lowest strike on a tie)
+    nearest = np.where(nearby, np.abs(strike - spot), np.inf).argmin(axis=1)[:, None]
+    spot_net = np.take_along_axis(net_gex, nearest, axis=1)[:, 0]
+    regime = np.where(spot_net > 0, 'POSITIVE', 'NEGATIVE').astype(object)
+    regime[~nearby.any(axis=1)] = None
+    
+    return {
+        'magnet': _strike_at_max(strike, net_gex, nearby & (net_gex > 0)),
+        'resistance': _strike_at_max(strike, total_gamma, nearby & (strike > spot)),
+        'support': _strike_at_max(strike, total_gamma, nearby & (strike < spot)),
+        'flip': flip,
+        'put_wall': np.where(max_put > 0, _strike_at_max(strike, put_oi, nearby), np.nan),
+        'call_wall': np.where(max_call > 0, _strike_at_max(strike, call_oi, nearby), np.nan),
+        'gamma_regime': regime,
+    }
+
+
+def find_key_levels(gex_df, spot):
+    """Identify key GEX levels: magnet, resistance, support, flip"""
+    if gex_df.empty:
+        return {}
+    
+    with span('find_key_levels', rows=len(gex_df)):
+        batch = find_key_levels_batch(**stack_gex([gex_df]), spot=[spot])
+    if batch['gamma_regime'][0] is None:
+        return {}
+    
+    return {key: (values[0] if key == 'gamma_regime' else None if np.isnan(values[0]) else values[0])
+            for key, values in batch.items()}
+
+
+def chain_gamma_contracts(chains, now=None):
+    """Per-contract arrays for the Black-Scholes gamma engine across one or more chains"""
+    parts = [contract_arrays(c['calls'], c['puts'], time_to_expiry(c['expiry'], now)) for c in chains]
+    return tuple(np.concatenate(cols) for cols in zip(*parts))
+
+
+# ─── HIGHER-ORDER EXPOSURE ─────────────────────────────────────
+
+EXPOSURE_COLUMNS = ['vanna_ex', 'charm_ex', 'vomma_ex']
+CLOSE_STEPS = 14   # Points on the path from now to the close
+
+
+def exposure_by_strike(contracts, spot, strikes, contract_mult=100):
+    """Vanna, charm and vomma exposure of chain_gamma_contracts summed onto sorted ``strikes``"""
+    strike, iv, t, weight = contracts
+    pos = np.minimum(np.searchsorted(strikes, strike), max(len(strikes) - 1, 0))
+    keep = strikes[pos] == strike if len(strikes) else np.zeros(len(strike), dtype=bool)
+    per_contract = bs_exposures(spot, strike[keep], iv[keep], t[keep], weight[keep], contract_mult)
+    return {col: np.bincount(pos[keep], weights=values, minlength=len(strikes))
+            for col, values in zip(EXPOSURE_COLUMNS, per_contract)}
+
+
+def add_exposures(gex_df, contracts, spot, contract_mult=100):
+    """GEX table with EXPOSURE_COLUMNS appended"""
+    return gex_df.assign(**exposure_by_strike(contracts, spot, gex_df['strike'].to_numpy(dtype=float), contract_mult))
+
+
+def exposure_into_close(contracts, spot, now=None, steps=CLOSE_STEPS, contract_mult=100):
+    """
+    Total vanna, charm and vomma exposure at spot from now to today's 16:00 close.
+
+    Every contract's time to expiry is stepped down together in one
+    (contracts x steps) pass. Empty after the close.
+    """
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now)
+    if now.tzinfo is None:
+        now = now.tz_localize(MARKET_TZ)
+    close = now.normalize() + MARKET_CLOSE
+    if now >= close or len(contracts[0]) == 0:
+        return pd.DataFrame(columns=['ts'] + EXPOSURE_COLUMNS)
+
+    times = pd.date_range(now, close, periods=steps)
+    elapsed = np.asarray((times - now).total_seconds()) / (365 * 24 * 3600)
+    strike, iv, t, weight = contracts
+    t_path = np.maximum(t[:, None] - elapsed[None, :], MIN_T)
+    per_contract = bs_exposures(spot, strike[:, None], iv[:, None], t_path, weight[:, None], contract_mult)
+    return pd.DataFrame({'ts': times, **{col: values.sum(axis=0) for col, values in zip(EXPOSURE_COLUMNS, per_contract)}})
+
+
+# ─── STRIKE TABLE ──────────────────────────────────────────────
+
+# MATRIX tab columns, in display order, as renames of strike table columns
+MATRIX_COLUMNS = {
+    'put_oi': 'P_OI', 'put_vol': 'P_Vol', 'put_iv': 'P_IV', 'put_delta': 'P_Delta', 'put_gamma': 'P_Gamma',
+    'put_last': 'P_Last', 'strike': 'Strike', 'call_last': 'C_Last', 'call_gamma': 'C_Gamma',
+    'call_delta': 'C_Delta', 'call_iv': 'C_IV', 'call_vol': 'C_Vol', 'call_oi': 'C_OI', 'net_gex': 'Net_GEX',
+}
+
+
+def _last_by_strike(side, strikes):
+    """Each strike's last price on one side (first row per strike, like the GEX table), NaN where absent"""
+    first = _first_per_strike(side)
+    last = np.full(len(strikes), np.nan)
+    last[np.searchsorted(strikes, side['strikePrice'].to_numpy(dtype=float)[first])] = \
+        side['lastPrice'].to_numpy(dtype=float)[first]
+    return last
+
+
+def strike_table(gex_df, calls=None, puts=None):
+    """
+    The one strike-indexed wide table per snapshot: the GEX table (plus any
+    exposure columns) with each side's last price, sorted by strike.
+
+    Every view of a snapshot is a range_slice of it, so tabs never re-merge or
+    disagree. Last prices are NaN without a single chain (term structure).
+    """
+    if not gex_df['strike'].is_monotonic_increasing:
+        gex_df = gex_df.sort_values('strike', ignore_index=True)
+    strikes = gex_df['strike'].to_numpy(dtype=float)
+    no_side = np.full(len(strikes), np.nan)
+    return gex_df.assign(call_last=no_side if calls is None else _last_by_strike(calls, strikes),
+                         put_last=no_side if puts is None else _last_by_strike(puts, strikes))
+
+
+def range_slice(table, lower, upper):
+    """Rows of a strike table with lower <= strike <= upper, as a positional slice (copy-on-write, not a copy)"""
+    strikes = table['strike'].to_numpy()
+    return table.iloc[np.searchsorted(strikes, lower, 'left'):np.searchsorted(strikes, upper, 'right')]
+
+
+def matrix_view(table):
+    """A strike table (slice) in MATRIX tab layout: calls and puts side by side around the strike"""
+    return table[list(MATRIX_COLUMNS)].rename(columns=MATRIX_COLUMNS)
+
+
+# ─── PIPELINE ──────────────────────────────────────────────────
+
+def summarize_chain(result, range_pct=LEVEL_BAND, contract_mult=100, gex_df=None):
+    """Reduce a fetched chain to spot, expiry, regime, totals in ±range and key levels"""
+    spot = result['spot']
+    if gex_df is None:
+        gex_df = compute_gex(result['calls'], result['puts'], spot, contract_mult)
+    levels = find_key_levels(gex_df, spot)
+    in_range = gex_df[(gex_df['strike'] >= spot * (1 - range_pct)) & (gex_df['strike'] <= spot * (1 + range_pct))]
+    return {
+        'spot': float(spot),
+        'expiry': result['expiry'],
+        'regime': levels.get('gamma_regime', 'UNKNOWN'),
+        'net_gex': float(in_range['net_gex'].sum()),
+        'call_gex': float(in_range['call_gex'].sum()),
+        'put_gex': float(in_range['put_gex'].sum()),
+        'net_dex': float(in_range['net_dex'].sum()),
+        'magnet': levels.get('magnet'),
+        'resistance': levels.get('resistance'),
+        'support': levels.get('support'),
+        'flip': levels.get('flip'),
+        'call_wall': levels.get('call_wall'),
+        'put_wall': levels.get('put_wall'),
+    }
+
+
+def run_pipeline(ticker_symbol, expiry_offset=0, range_pct=LEVEL_BAND, contract_mult=100,
+                 archive=True, fetch=None):
+    """
+    Fetch one chain and run it through compute_gex, find_key_levels, the zero-gamma solver and add_exposures.
+
+    Returns {'ticker', 'expiry_offset', 'summary', 'gex_df', 'log', 'elapsed_s'};
+    summary and gex_df are None when the fetch failed.
+    """
+    started = time.perf_counter()
+    if fetch is None:
+        result, log = fetch_chain(ticker_symbol, expiry_offset, archive=archive)
+    else:
+        result, log = fetch(ticker_symbol, expiry_offset)
+    
+    summary, gex_df = None, None
+    if result is not None:
+        gex_df = compute_gex(result['calls'], result['puts'], result['spot'], contract_mult)
+        summary = summarize_chain(result, range_pct, contract_mult, gex_df=gex_df)
+        contracts = chain_gamma_contracts([result])
+        grid, curve = gamma_profile(contracts, result['spot'], width=max(range_pct, LEVEL_BAND))
+        summary['zero_gamma'] = zero_gamma(contracts, grid, curve, result['spot'])
+        gex_df = strike_table(add_exposures(gex_df, contracts, result['spot'], contract_mult),
+                              result['calls'], result['puts'])
+        in_range = range_slice(gex_df, result['spot'] * (1 - range_pct), result['spot'] * (1 + range_pct))
+        summary.update({col: float(in_range[col].sum()) for col in EXPOSURE_COLUMNS})
+    
+    return {
+        'ticker': ticker_symbol,
+        'expiry_offset': expiry_offset,
+        'summary': summary,
+        'gex_df': gex_df,
+        'log': log,
+        'elapsed_s': time.perf_counter() - started,
+    }
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+
+MARKET_TZ = 'America/New_York'
+MARKET_CLOSE = pd.Timedelta(hours=16)
+MIN_T = 15 / (365 * 24 * 60)   # Floor time to expiry at 15 minutes so 0DTE gamma stays finite
+GRID_POINTS = 300
+ROOT_ITERATIONS = 60            # Bisection steps: brackets shrink by 2**-60
+
+
+def time_to_expiry(expiry, now=None):
+    """Years from now to the 16:00 New York close on the expiry date"""
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now)
+    if now.tzinfo is None:
+        now = now.tz_localize(MARKET_TZ)
+    close = pd.Timestamp(expiry).tz_localize(MARKET_TZ) + MARKET_CLOSE
+    return max((close - now).total_seconds() / (365 * 24 * 3600), MIN_T)
+
+
+def contract_arrays(calls, puts, t):
+    """
+    Stack a chain into per-contract arrays for the gamma engine.
+
+    Returns (strike, iv, t, weight) where iv is a decimal and weight is the
+    dealer-signed open interest (calls +, puts -, matching compute_gex).
+    Contracts without OI or IV carry no gamma and are dropped.
+    """
+    parts = []
+    for side, sign in ((calls, 1.0), (puts, -1.0)):
+        strike = side['strikePrice'].to_numpy(dtype=float)
+        iv = side['volatility'].to_numpy(dtype=float) / 100
+        oi = side['openInterest'].to_numpy(dtype=float)
+        keep = (strike > 0) & (iv > 0) & (oi > 0)
+        parts.append((strike[keep], iv[keep], np.full(keep.sum(), t, dtype=float), sign * oi[keep]))
+    return tuple(np.concatenate(cols) for cols in zip(*parts))
+
+
+def bs_gamma(spot, strike, iv, t):
+    """Black-Scholes gamma (r = q = 0), broadcasting over any shapes"""
+    vol_t = iv * np.sqrt(t)
+    d1 = (np.log(spot / strike) + 0.5 * vol_t ** 2) / vol_t
+    return np.exp(-0.5 * d1 ** 2) / (np.sqrt(2 * np.pi) * spot * vol_t)
+
+
+def bs_exposures(spot, strike, iv, t, weight, contract_mult=100):
+    """
+    Dealer vanna, charm and vomma exposure per contract (r = q = 0), sharing one d1/d2 pass.
+
+    ``weight`` is dealer-signed OI as in contract_arrays. Vanna is the $ delta
+    change per vol point, charm the $ delta change per calendar day, vomma the
+    vega ($ per vol point) change per vol point. Broadcasts like bs_gamma.
+    """
+    vol_t = iv * np.sqrt(t)
+    d1 = (np.log(spot / strike) + 0.5 * vol_t ** 2) / vol_t
+    d2 = d1 - vol_t
+    pdf = np.exp(-0.5 * d1 ** 2) / np.sqrt(2 * np.pi)
+    notional = weight * contract_mult * spot
+    vanna = -pdf * d2 / iv * notional / 100
+    charm = pdf * d2 / (2 * t) * notional / 365
+    vomma = pdf * np.sqrt(t) * d1 * d2 / iv * notional / 1e4
+    return vanna, charm, vomma
+
+
+def dealer_gamma(spots, strike, iv, t, weight, contract_mult=100):
+    """Total dealer GEX at each hypothetical spot, one (contracts x spots) pass"""
+    spots = np.atleast_1d(np.asarray(spots, dtype=float))
+    vol_t = iv * np.sqrt(t)
+    # GEX = gamma * S * OI * mult and gamma * S = pdf(d1) / vol_t, so spot
+    # only enters through log-moneyness; logs stay on the vectors
+    d1 = np.log(spots)[None, :] - np.log(strike)[:, None]
+    d1 /= vol_t[:, None]
+    d1 += 0.5 * vol_t[:, None]
+    np.square(d1, out=d1)
+    d1 *= -0.5
+    np.exp(d1, out=d1)
+    return (weight / (vol_t * np.sqrt(2 * np.pi))) @ d1 * contract_mult
+
+
+def gamma_profile(contracts, spot, width=0.05, points=GRID_POINTS, contract_mult=100):
+    """Dealer GEX over a spot grid of +/- width around spot, returns (spot grid, GEX)"""
+    grid = np.linspace(spot * (1 - width), spot * (1 + width), points)
+    return grid, dealer_gamma(grid, *contracts, contract_mult=contract_mult)
+
+
+def zero_gamma(contracts, grid, profile, spot, contract_mult=100):
+    """
+    Solve for the zero-gamma spot nearest the current spot.
+
+    Every sign change on the grid is bracketed and all brackets are refined
+    together by vectorized bisection on the exact profile. Returns None when
+    the profile never crosses zero inside the grid.
+    """
+    crossing = np.nonzero(np.sign(profile[:-1]) * np.sign(profile[1:]) < 0)[0]
+    if len(crossing) == 0:
+        return None
+
+    lo, hi = grid[crossing], grid[crossing + 1]
+    f_lo = profile[crossing]
+    for _ in range(ROOT_ITERATIONS):
+        mid = (lo + hi) / 2
+        f_mid = dealer_gamma(mid, *contracts, contract_mult=contract_mult)
+        left = np.sign(f_mid) == np.sign(f_lo)
+        lo, f_lo = np.where(left, mid, lo), np.where(left, f_mid, f_lo)
+        hi = np.where(left, hi, mid)
+
+    roots = (lo + hi) / 2
+    return float(roots[np.argmin(np.abs(roots - spot))])
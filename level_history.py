@@ -0,0 +1,103 @@
+"""
+Bounded intraday history of GEX levels per (ticker, expiry).
+
+Every good fetch appends one row (spot, regime, ±5% totals, flip, magnet,
+walls) to a fixed-capacity ring buffer, so memory stays capped however long
+the server runs: HISTORY_CAPACITY rows per key and at most HISTORY_KEYS
+keys, evicting the key updated least recently.
+"""
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+
+from greeks import MARKET_TZ
+from gex_pipeline import LEVEL_BAND, summarize_chain
+from telemetry import muted, span
+
+
+HISTORY_FIELDS = ['spot', 'net_gex', 'call_gex', 'put_gex', 'flip', 'magnet', 'call_wall', 'put_wall']
+HISTORY_CAPACITY = 1024   # Rows per key: ~3.5 days at one fetch per 5 minutes
+HISTORY_KEYS = 64         # (ticker, expiry) buffers kept at once
+REGIMES = {'POSITIVE': 1, 'NEGATIVE': -1}
+
+
+class LevelHistory:
+    """Ring buffer of one key's levels; the oldest row is overwritten once full"""
+
+    def __init__(self, capacity=HISTORY_CAPACITY):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity)
+        self.values = np.full((capacity, len(HISTORY_FIELDS)), np.nan)
+        self.regime = np.zeros(capacity, dtype=np.int8)
+        self.snapshot_ids = np.zeros(capacity, dtype=np.int64)
+        self.head = 0
+        self.count = 0
+
+    def append(self, summary, ts=None, snapshot_id=0):
+        """Record one summarize_chain row; a snapshot already recorded last is skipped"""
+        last = (self.head - 1) % self.capacity
+        if snapshot_id and self.count and self.snapshot_ids[last] == snapshot_id:
+            return False
+        self.ts[self.head] = time.time() if ts is None else ts
+        self.values[self.head] = [np.nan if summary.get(f) is None else summary[f] for f in HISTORY_FIELDS]
+        self.regime[self.head] = REGIMES.get(summary.get('regime'), 0)
+        self.snapshot_ids[self.head] = snapshot_id
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return True
+
+    def frame(self):
+        """Rows oldest first, with a market-time 'ts' and a 'regime' of +1/-1/0"""
+        order = (np.arange(self.count) + self.head - self.count) % self.capacity
+        df = pd.DataFrame(self.values[order], columns=HISTORY_FIELDS)
+        df.insert(0, 'ts', pd.to_datetime(self.ts[order], unit='s', utc=True).floor('s').tz_convert(MARKET_TZ))
+        df['regime'] = self.regime[order]
+        return df
+
+
+class HistoryStore:
+    """Process-wide LevelHistory per (ticker, expiry date), safe to record from fetch threads"""
+
+    def __init__(self, capacity=HISTORY_CAPACITY, max_keys=HISTORY_KEYS):
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._histories = {}
+        self._lock = threading.Lock()
+
+    def record(self, ticker, result, summary):
+        key = (ticker, result['expiry'])
+        with self._lock:
+            history = self._histories.pop(key, None) or LevelHistory(self.capacity)
+            self._histories[key] = history  # Re-inserted last: dict order tracks recency
+            while len(self._histories) > self.max_keys:
+                del self._histories[next(iter(self._histories))]
+            return history.append(summary, snapshot_id=result.get('snapshot_id', 0))
+
+    def frame(self, ticker, expiry):
+        """This key's history oldest first, or None before its first fetch"""
+        with self._lock:
+            history = self._histories.get((ticker, expiry))
+            return history.frame() if history is not None else None
+
+    def stats(self):
+        with self._lock:
+            return {'keys': len(self._histories), 'rows': sum(h.count for h in self._histories.values()),
+                    'bytes': sum(h.ts.nbytes + h.values.nbytes + h.regime.nbytes + h.snapshot_ids.nbytes
+                                 for h in self._histories.values())}
+
+
+def recording(fetch, store, range_pct=LEVEL_BAND):
+    """Wrap ``fetch(ticker, expiry_offset)`` so every good chain is also summarized into ``store``"""
+    def fetch_and_record(ticker_symbol, expiry_offset=0):
+        result, log = fetch(ticker_symbol, expiry_offset)
+        if result is not None:
+            try:
+                # Timed as its own stage; inner compute_gex / find_key_levels spans would skew rerun percentiles
+                with span('level_history.record', ticker=ticker_symbol), muted():
+                    store.record(ticker_symbol, result, summarize_chain(result, range_pct))
+            except Exception as e:
+                log = log + [f"⚠ Level history not recorded: {str(e)}"]
+        return result, log
+    return fetch_and_record
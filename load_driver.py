@@ -0,0 +1,160 @@
+"""
+Offline load test: N simulated dashboard sessions against mock_upstream.
+
+Every session is a Streamlit AppTest of app.py running in this process, so
+they share the process-wide caches, prefetcher and upstream guards exactly
+like sessions on one server. Each session loops over reruns, Refresh clicks
+and ticker switches with exponential think time, and the driver reports
+end-to-end rerun latency (p50/p95/p99), throughput, errors, upstream
+traffic and peak RSS. Needs no network.
+
+    python load_driver.py --sessions 8 --duration 60
+    python load_driver.py --sessions 16 --latency-ms 120 --error-rate 0.05 --json load.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, 'app.py')
+TICKERS = ["SPY", "QQQ", "IWM", "SPX"]
+ACTIONS = {'rerun': 0.7, 'ticker': 0.2, 'refresh': 0.1}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (VmHWM), in MB"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+class Session(threading.Thread):
+    """One simulated user clicking around the dashboard"""
+
+    def __init__(self, index, deadline, think_s, timeout, samples, lock):
+        super().__init__(name=f'session-{index}', daemon=True)
+        self.rng = random.Random(index)
+        self.deadline = deadline
+        self.think_s = think_s
+        self.timeout = timeout
+        self.samples = samples
+        self.lock = lock
+
+    def _timed(self, action, step):
+        started = time.perf_counter()
+        error = None
+        try:
+            at = step()
+            if at.exception:
+                error = at.exception[0].value
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        with self.lock:
+            self.samples.append({'action': action, 'seconds': time.perf_counter() - started, 'error': error})
+
+    def run(self):
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(APP, default_timeout=self.timeout)
+        self._timed('first_load', at.run)
+        while time.monotonic() < self.deadline:
+            time.sleep(self.rng.expovariate(1 / self.think_s) if self.think_s else 0)
+            action = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+            if action == 'ticker':
+                self._timed(action, lambda: at.selectbox[0].select(self.rng.choice(TICKERS)).run())
+            elif action == 'refresh':
+                self._timed(action, lambda: at.button[0].click().run())
+            else:
+                self._timed(action, at.run)
+
+
+def summarize(samples, elapsed):
+    rows = {}
+    for action in ['all'] + sorted({s['action'] for s in samples}):
+        chosen = [s for s in samples if action == 'all' or s['action'] == action]
+        ms = np.array([s['seconds'] for s in chosen]) * 1000
+        rows[action] = {
+            'count': len(chosen),
+            'errors': sum(s['error'] is not None for s in chosen),
+            'p50_ms': round(float(np.percentile(ms, 50)), 1),
+            'p95_ms': round(float(np.percentile(ms, 95)), 1),
+            'p99_ms': round(float(np.percentile(ms, 99)), 1),
+            'max_ms': round(float(ms.max()), 1),
+        }
+    rows['all']['throughput_per_s'] = round(len(samples) / elapsed, 2)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline multi-session load test for app.py")
+    parser.add_argument('--sessions', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=60, help="Seconds of load after start-up")
+    parser.add_argument('--think', type=float, default=1.0, help="Mean think time between actions (s)")
+    parser.add_argument('--latency-ms', type=float, default=50.0, help="Mock upstream latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of API calls answered 503")
+    parser.add_argument('--recordings', help="Recorded payloads for the mock to replay")
+    parser.add_argument('--prefetch', action='store_true', help="Run with the background prefetcher on")
+    parser.add_argument('--timeout', type=float, default=120, help="Per-rerun AppTest timeout (s)")
+    parser.add_argument('--json', help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('STREAMLIT_LOGGER_LEVEL', 'error')  # Bare-mode AppTest warnings would drown the report
+    from mock_upstream import MockUpstream, install_yfinance_stub
+
+    # The app reads these at import, so they must be set before the first session starts
+    mock = MockUpstream(recordings=args.recordings, latency_ms=args.latency_ms, error_rate=args.error_rate).start()
+    os.environ['BARCHART_BASE_URL'] = mock.base_url
+    os.environ['GEX_PREFETCH'] = '1' if args.prefetch else '0'
+    os.environ.setdefault('GEX_ARCHIVE_DIR', tempfile.mkdtemp(prefix='gex_load_archive_'))
+    install_yfinance_stub()
+
+    samples, lock = [], threading.Lock()
+    started = time.monotonic()
+    sessions = [Session(i, started + args.duration, args.think, args.timeout, samples, lock)
+                for i in range(args.sessions)]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    elapsed = time.monotonic() - started
+    mock.stop()
+
+    from upstream import upstream_stats
+
+    report = {
+        'config': vars(args),
+        'elapsed_s': round(elapsed, 1),
+        'latency': summarize(samples, elapsed),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+        'mock_upstream': mock.counts,
+        'upstreams': upstream_stats(),
+        'errors': sorted({str(s['error'])[:200] for s in samples if s['error'] is not None})[:10],
+    }
+
+    print(f"{args.sessions} sessions, {elapsed:.0f}s, {report['latency']['all']['throughput_per_s']} reruns/s, "
+          f"peak RSS {report['peak_rss_mb']} MB")
+    print(f"{'action':<12}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for action, row in report['latency'].items():
+        print(f"{action:<12}{row['count']:>7}{row['errors']:>8}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+    print(f"Mock upstream: {mock.counts}")
+    for error in report['errors']:
+        print(f"ERROR: {error}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 1 if report['latency']['all']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
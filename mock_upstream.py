@@ -0,0 +1,223 @@
+"""
+Local stand-in for Barchart and yfinance, for offline load tests.
+
+Serves the volatility-greeks page (sets an XSRF-TOKEN cookie) and the
+core-api options/get endpoint, checking the token like Barchart does.
+Responses are replayed from recorded payloads when a recording exists for
+the (ticker, expiry), else synthesized from synthetic_chain. Run it with
+BARCHART_BASE_URL=http://127.0.0.1:<port> and install_yfinance_stub() in
+the process under test; nothing touches the network.
+
+    python mock_upstream.py serve --port 8765 --latency-ms 80
+    python mock_upstream.py record SPY QQQ --out recordings/   # needs network, once
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from synthetic_chain import barchart_payload, synthetic_chain
+
+
+TOKEN = 'mock-xsrf-token'
+SPOTS = {'SPY': 500.0, 'QQQ': 430.0, 'IWM': 200.0, '$SPX': 5000.0}
+STRIKES = 300            # Strikes per side for synthesized chains
+LISTED_EXPIRIES = 8
+
+
+def listed_expiries(n=LISTED_EXPIRIES, today=None):
+    """The next n weekdays as YYYY-MM-DD, a daily-expiry calendar like SPY's"""
+    today = pd.Timestamp.now(tz='America/New_York').normalize().tz_localize(None) if today is None else today
+    return [d.strftime('%Y-%m-%d') for d in pd.bdate_range(today, periods=n)]
+
+
+def recording_path(root, symbol, expiry):
+    return os.path.join(root, f"{symbol.replace('$', '')}_{expiry}.json")
+
+
+class MockUpstream:
+    """
+    Threaded HTTP server answering like Barchart.
+
+    ``latency_ms`` adds a per-request delay (jittered ±50%), ``error_rate``
+    answers that fraction of API calls with a 503, and every ``token_ttl``
+    seconds the token rotates so clients exercise their re-bootstrap path.
+    """
+
+    def __init__(self, port=0, recordings=None, latency_ms=0.0, error_rate=0.0, token_ttl=None):
+        self.recordings = recordings
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        self.started = time.monotonic()
+        self.counts = {'page': 0, 'api': 0, 'rejected': 0, 'errors': 0, 'bytes': 0}
+        self._payloads = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name='mock-upstream', daemon=True)
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server.server_address[1]}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def token(self):
+        if not self.token_ttl:
+            return TOKEN
+        return f'{TOKEN}-{int((time.monotonic() - self.started) // self.token_ttl)}'
+
+    def payload(self, symbol, expiry):
+        """Serialized options/get body for a key, built once and reused"""
+        key = (symbol, expiry)
+        with self._lock:
+            if key in self._payloads:
+                return self._payloads[key]
+        path = recording_path(self.recordings, symbol, expiry) if self.recordings else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                body = f.read()
+        else:
+            spot = SPOTS.get(symbol, 100.0)
+            seed = zlib.crc32(f'{symbol}|{expiry}'.encode())
+            days = max(1, (pd.Timestamp(expiry) - pd.Timestamp.now().normalize()).days)
+            body = json.dumps(barchart_payload(synthetic_chain(STRIKES, seed=seed, spot=spot, days=days), spot)).encode()
+        with self._lock:
+            self._payloads[key] = body
+        return body
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counts[key] += n
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _delay(self):
+                if mock.latency_ms:
+                    time.sleep(mock.latency_ms * random.uniform(0.5, 1.5) / 1000)
+
+            def _send(self, status, body, content_type='application/json', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                mock._count('bytes', len(body))
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                self._delay()
+                if url.path.endswith('/volatility-greeks'):
+                    mock._count('page')
+                    token = mock.token()
+                    self._send(200, b'<html><body>volatility greeks</body></html>', 'text/html',
+                               {'Set-Cookie': f'XSRF-TOKEN={token.replace("=", "%3D")}; Path=/'})
+                elif url.path == '/proxies/core-api/v1/options/get':
+                    mock._count('api')
+                    if self.headers.get('x-xsrf-token') != mock.token():
+                        mock._count('rejected')
+                        self._send(419, b'{"error": "token mismatch"}')
+                    elif mock.error_rate and random.random() < mock.error_rate:
+                        mock._count('errors')
+                        self._send(503, b'{"error": "unavailable"}')
+                    else:
+                        query = parse_qs(url.query)
+                        self._send(200, mock.payload(query['baseSymbol'][0], query['expirationDate'][0]))
+                else:
+                    self._send(404, b'{"error": "not found"}')
+
+        return Handler
+
+
+class _StubTicker:
+    """yfinance.Ticker stand-in: a daily expiry calendar and a flat 5-day history"""
+
+    def __init__(self, ticker_symbol):
+        self.ticker_symbol = ticker_symbol
+
+    @property
+    def options(self):
+        return tuple(listed_expiries())
+
+    def history(self, period='5d', **kwargs):
+        spot = SPOTS.get('$SPX' if self.ticker_symbol == 'SPX' else self.ticker_symbol, 100.0)
+        return pd.DataFrame({'Close': [spot] * 5}, index=pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=5))
+
+
+def install_yfinance_stub():
+    """Point yfinance.Ticker at the offline stub for this process"""
+    import yfinance
+    yfinance.Ticker = _StubTicker
+
+
+def record(tickers, out, n_expiries=3):
+    """Save live options/get payloads for the nearest expiries (the one step that needs network)"""
+    from barchart_client import base_symbol
+    from gex_pipeline import CHAIN_FIELDS, SPOT_FIELD, barchart_session, expiry_calendar
+
+    os.makedirs(out, exist_ok=True)
+    for ticker in tickers:
+        log = []
+        for expiry in expiry_calendar(ticker, log)[:n_expiries]:
+            params = {'baseSymbol': base_symbol(ticker), 'groupBy': 'optionType', 'expirationDate': expiry,
+                      'orderBy': 'strikePrice', 'orderDir': 'asc', 'raw': '1', 'fields': f'{CHAIN_FIELDS},{SPOT_FIELD}'}
+            r = barchart_session().get_options(ticker, params, log)
+            path = recording_path(out, base_symbol(ticker), expiry)
+            with open(path, 'wb') as f:
+                f.write(r.content)
+            print(f"✓ {path} ({len(r.content) / 1024:.0f} KB)", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline Barchart stand-in")
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help="Serve the mock until interrupted")
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--recordings', help="Directory of recorded payloads to replay")
+    serve.add_argument('--latency-ms', type=float, default=0.0)
+    serve.add_argument('--error-rate', type=float, default=0.0)
+    serve.add_argument('--token-ttl', type=float, help="Rotate the XSRF token every N seconds")
+    rec = sub.add_parser('record', help="Record live payloads for later replay")
+    rec.add_argument('tickers', nargs='+')
+    rec.add_argument('--out', default='recordings')
+    rec.add_argument('--expiries', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record(args.tickers, args.out, args.expiries)
+        return 0
+
+    mock = MockUpstream(args.port, args.recordings, args.latency_ms, args.error_rate, args.token_ttl).start()
+    print(f"Mock Barchart at {mock.base_url} (export BARCHART_BASE_URL={mock.base_url})", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
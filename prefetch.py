@@ -0,0 +1,136 @@
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class _Job:
+    """One (ticker, expiry offset) refreshed on its own cadence"""
+
+    def __init__(self, ticker, expiry_offset, interval):
+        self.ticker = ticker
+        self.expiry_offset = expiry_offset
+        self.interval = interval
+        self.next_due = 0.0
+        self.running = False
+        self.result = None
+        self.log = []
+        self.fetched_at = None      # wall clock of the last good snapshot
+        self.last_duration = None
+        self.lag = 0.0              # how late the last run started vs its due time
+        self.failures = 0
+        self.last_error = None
+
+
+class PrefetchScheduler:
+    """
+    Background thread that keeps the latest chain for every scheduled
+    (ticker, expiry offset) fresh, so UI reruns only read completed snapshots.
+
+    ``schedule`` maps ticker -> {'interval': seconds, 'expiries': [offsets]};
+    ``fetch(ticker, expiry_offset)`` must return ``(result or None, log)``.
+    A failed refresh keeps serving the previous good snapshot.
+    """
+
+    def __init__(self, fetch, schedule, max_workers=4, tick=1.0):
+        self.fetch = fetch
+        self.tick = tick
+        self.jobs = {}
+        for ticker, cfg in schedule.items():
+            for offset in cfg.get('expiries', [0]):
+                job = _Job(ticker, offset, cfg.get('interval', 300))
+                # Spread the first round so we don't burst the upstream at start
+                job.next_due = time.monotonic() + random.uniform(0, min(job.interval, 10))
+                self.jobs[(ticker, offset)] = job
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='prefetch-scheduler', daemon=True)
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    @property
+    def alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due = [job for job in self.jobs.values() if not job.running and job.next_due <= now]
+                for job in due:
+                    job.running = True
+                    job.lag = now - job.next_due
+            for job in due:
+                self._pool.submit(self._refresh, job)
+            self._stop.wait(self.tick)
+
+    def _refresh(self, job):
+        started = time.monotonic()
+        try:
+            result, log = self.fetch(job.ticker, job.expiry_offset)
+        except Exception as e:
+            result, log = None, [f"ERROR: {str(e)}"]
+
+        with self._lock:
+            job.last_duration = time.monotonic() - started
+            if result is not None:
+                job.result, job.log, job.fetched_at = result, log, time.time()
+                job.failures, job.last_error = 0, None
+            else:
+                job.failures += 1
+                job.last_error = next((e for e in reversed(log) if 'ERROR' in e), 'ERROR: fetch failed')
+            job.next_due = time.monotonic() + job.interval
+            job.running = False
+            self._done.notify_all()
+
+    def latest(self, ticker, expiry_offset):
+        """Latest completed snapshot as {'result', 'log', 'age', 'failing'} or None if there is none yet"""
+        with self._lock:
+            job = self.jobs.get((ticker, expiry_offset))
+            if job is None or job.result is None:
+                return None
+            return {'result': job.result, 'log': job.log, 'age': time.time() - job.fetched_at,
+                    'failing': job.failures > 0}
+
+    def refresh_now(self, ticker, expiry_offset):
+        """Refresh one scheduled key synchronously (e.g. from a Refresh button), joining a run already in flight"""
+        job = self.jobs.get((ticker, expiry_offset))
+        if job is None:
+            return None
+        with self._lock:
+            if job.running:
+                self._done.wait_for(lambda: not job.running)
+                joined = True
+            else:
+                job.running, joined = True, False
+        if not joined:
+            self._refresh(job)
+        return self.latest(ticker, expiry_offset)
+
+    def health(self):
+        """Per-job freshness and lag figures, plus scheduler liveness"""
+        now = time.time()
+        with self._lock:
+            rows = [{
+                'ticker': job.ticker,
+                'expiry_offset': job.expiry_offset,
+                'interval_s': job.interval,
+                'age_s': None if job.fetched_at is None else round(now - job.fetched_at, 1),
+                'start_lag_s': round(job.lag, 2),
+                'last_fetch_s': None if job.last_duration is None else round(job.last_duration, 2),
+                'running': job.running,
+                'failures': job.failures,
+                'last_error': job.last_error,
+            } for job in self.jobs.values()]
+        return {'alive': self.alive, 'uptime_s': round(now - self.started_at, 1) if self.started_at else 0,
+                'jobs': rows}
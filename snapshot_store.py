@@ -0,0 +1,135 @@
+import os
+import glob
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+
+
+DEFAULT_ROOT = os.environ.get(
+    'GEX_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gex_archive'))
+
+TS_FORMAT = '%Y%m%dT%H%M%S%fZ'
+
+# Compact on-disk schema: float32 greeks, int32 counts, dictionary-encoded labels.
+# Strikes and spot stay float64 so they key exactly like the live chain.
+SCHEMA = pa.schema([
+    ('snapshot_ts', pa.timestamp('us', tz='UTC')),
+    ('expiry', pa.dictionary(pa.int8(), pa.string())),
+    ('spot', pa.float64()),
+    ('symbol', pa.string()),
+    ('optionType', pa.dictionary(pa.int8(), pa.string())),
+    ('strikePrice', pa.float64()),
+    ('lastPrice', pa.float32()),
+    ('volatility', pa.float32()),
+    ('delta', pa.float32()),
+    ('gamma', pa.float32()),
+    ('theta', pa.float32()),
+    ('vega', pa.float32()),
+    ('volume', pa.int32()),
+    ('openInterest', pa.int32()),
+])
+CHAIN_COLUMNS = SCHEMA.names[3:]
+
+
+def _utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+class SnapshotStore:
+    """
+    Append-only archive of fetched option chains.
+
+    Every snapshot is one immutable, uncompressed Arrow IPC file under
+    ``ticker=<T>/expiry=<YYYY-MM-DD>/date=<YYYY-MM-DD>/<timestamp>.arrow`` so
+    reads can memory-map the columns without copying or decoding them.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def append(self, ticker, expiry, raw_df, spot, ts=None):
+        """Write one chain snapshot, returns its path"""
+        ts = _utc(ts if ts is not None else pd.Timestamp.now(tz='UTC'))
+        part = os.path.join(self.root, f'ticker={ticker}', f'expiry={expiry}',
+                            f'date={ts.strftime("%Y-%m-%d")}')
+        os.makedirs(part, exist_ok=True)
+
+        frame = raw_df.reindex(columns=CHAIN_COLUMNS, fill_value=0)
+        frame['optionType'] = frame['optionType'].astype(str).astype('category')
+        frame['symbol'] = frame['symbol'].astype(str)
+        frame.insert(0, 'snapshot_ts', ts)
+        frame.insert(1, 'expiry', pd.Categorical([str(expiry)] * len(frame)))
+        frame.insert(2, 'spot', float(spot))
+        table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+
+        # Write under a temp name then rename, so readers never see a partial file
+        path = os.path.join(part, f'{ts.strftime(TS_FORMAT)}.arrow')
+        tmp = f'{path}.{uuid.uuid4().hex}.tmp'
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, SCHEMA) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        return path
+
+    def list_snapshots(self, ticker, start=None, end=None, expiry=None):
+        """Index of archived snapshots (ts, expiry, path) in [start, end], from file names only"""
+        pattern = os.path.join(self.root, f'ticker={ticker}', f'expiry={expiry or "*"}', 'date=*')
+        first = _utc(start).strftime('%Y-%m-%d') if start is not None else ''
+        last = _utc(end).strftime('%Y-%m-%d') if end is not None else '9999'
+
+        # Only list date partitions that can hold snapshots in [start, end]
+        names, expiries, paths = [], [], []
+        for part in glob.glob(pattern):
+            if not first <= os.path.basename(part)[len('date='):] <= last:
+                continue
+            exp = os.path.basename(os.path.dirname(part))[len('expiry='):]
+            for entry in os.scandir(part):
+                if entry.name.endswith('.arrow'):
+                    names.append(entry.name[:-len('.arrow')])
+                    expiries.append(exp)
+                    paths.append(entry.path)
+
+        index = pd.DataFrame({'ts': pd.to_datetime(pd.Series(names, dtype=object), format=TS_FORMAT, utc=True),
+                              'expiry': pd.Series(expiries, dtype=object), 'path': pd.Series(paths, dtype=object)})
+        if start is not None:
+            index = index[index['ts'] >= _utc(start)]
+        if end is not None:
+            index = index[index['ts'] <= _utc(end)]
+        return index.sort_values(['ts', 'expiry']).reset_index(drop=True)
+
+    def read_range(self, ticker, start=None, end=None, expiry=None):
+        """All snapshots in [start, end] as one memory-mapped Arrow table (no copies)"""
+        paths = self.list_snapshots(ticker, start, end, expiry)['path']
+        if paths.empty:
+            return SCHEMA.empty_table()
+        return pa.concat_tables([read_snapshot_table(p) for p in paths])
+
+
+def read_snapshot_table(path):
+    """Memory-map one snapshot file; the returned table references the mapped pages"""
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def load_snapshot(path):
+    """Rebuild a fetch_barchart_data-style result dict from one archived snapshot"""
+    from gex_pipeline import OPTION_TYPES, chain_sides
+    
+    df = read_snapshot_table(path).to_pandas()
+    spot = float(df['spot'].iloc[0]) if not df.empty else float('nan')
+    expiry = str(df['expiry'].iloc[0]) if not df.empty else None
+    ts = df['snapshot_ts'].iloc[0] if not df.empty else None
+    df = df.drop(columns=['snapshot_ts', 'expiry', 'spot'])
+    df['optionType'] = df['optionType'].astype(str).astype(OPTION_TYPES)
+    df = df.sort_values('optionType', kind='stable', ignore_index=True)
+    
+    # calls/puts are row slices of raw_df, like live chains, so the chain is held once
+    calls, puts = chain_sides(df)
+    return {
+        'spot': spot,
+        'expiry': expiry,
+        'snapshot_ts': ts,
+        'calls': calls,
+        'puts': puts,
+        'raw_df': df,
+    }
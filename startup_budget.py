@@ -0,0 +1,96 @@
+"""
+Cold-start budget for app.py.
+
+Imports everything app.py loads before its first line of page code in a
+fresh interpreter, prints where the time goes (python -X importtime) and
+exits non-zero when the total is over budget or a deferred heavy module
+sneaks back onto the startup path.
+
+    python startup_budget.py                 # report + check against the default budget
+    python startup_budget.py --budget 1.5 --top 15
+"""
+import os
+import re
+import ast
+import sys
+import argparse
+import subprocess
+
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+DEFAULT_BUDGET = float(os.environ.get('GEX_STARTUP_BUDGET', '2.0'))  # Seconds, best of --runs
+
+# Already resident in the Streamlit server process before app.py runs
+PRELOADED = {'streamlit'}
+
+# Only the code paths that need these may import them (pyarrow is not listed:
+# pandas loads it for its string dtype anyway)
+DEFERRED = ('plotly', 'yfinance', 'requests')
+
+IMPORTTIME = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def startup_imports(path=APP):
+    """Import statements app.py runs before its first non-import statement"""
+    modules = []
+    for node in ast.parse(open(path).read()).body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(node.module)
+        else:
+            break
+    return [m for m in dict.fromkeys(modules) if m.split('.')[0] not in PRELOADED]
+
+
+def measure(modules):
+    """Cold import in a fresh interpreter, returns (total s, per-module rows, loaded deferred modules)"""
+    code = '; '.join([f'import {m}' for m in modules] +
+                     [f'import sys; print(",".join(sorted({{m.split(".")[0] for m in sys.modules}} & {set(DEFERRED)!r})))'])
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=os.path.dirname(APP))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, len(indent) // 2, int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    total = sum(cum for _, depth, _, cum in rows if depth == 0)
+    loaded = [m for m in proc.stdout.strip().split(',') if m]
+    return total, rows, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report and check app.py cold-start import time")
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help="Max seconds (default %(default)s)")
+    parser.add_argument('--runs', type=int, default=3, help="Fresh interpreters to try, best run counts")
+    parser.add_argument('--top', type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args(argv)
+
+    modules = startup_imports()
+    runs = [measure(modules) for _ in range(max(1, args.runs))]
+    total, rows, loaded = min(runs, key=lambda run: run[0])
+
+    print(f"Startup imports: {', '.join(modules)}")
+    print(f"{'module':<40}{'self s':>10}{'cumulative s':>14}")
+    top_level = sorted((r for r in rows if r[1] == 0), key=lambda r: -r[3])
+    for name, _, self_s, cumulative_s in top_level[:args.top]:
+        print(f"{name:<40}{self_s:>10.3f}{cumulative_s:>14.3f}")
+
+    ok = True
+    if loaded:
+        print(f"ERROR: deferred modules imported at startup: {', '.join(loaded)}")
+        ok = False
+    if total > args.budget:
+        print(f"ERROR: cold start {total:.3f}s is over the {args.budget:.3f}s budget")
+        ok = False
+    if ok:
+        print(f"✓ Cold start {total:.3f}s within the {args.budget:.3f}s budget")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Deterministic synthetic option chains for benchmarks and offline load tests.
+
+Strikes sit on a listed-style grid around spot, IV follows a skewed smile,
+greeks are Black-Scholes, and open interest clusters near the money and on
+round strikes with a lognormal spread, which is roughly what SPY/SPX chains
+look like. Same (n_strikes, seed) always gives the same chain.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from gex_pipeline import compact_chain
+
+
+def _norm_cdf(x):
+    return 0.5 * (1 + np.frompyfunc(math.erf, 1, 1)(x / math.sqrt(2)).astype(float))
+
+
+def synthetic_chain(n_strikes, seed=0, spot=500.0, days=7, base_iv=0.18):
+    """Raw chain (calls then puts, compact dtypes) with ``n_strikes`` strikes per side"""
+    rng = np.random.default_rng(seed)
+    # Listed-style spacing: fine near the money, the grid just widens as n grows
+    step = max(spot * 0.4 / n_strikes, 0.01)
+    strike = np.round(spot + (np.arange(n_strikes) - n_strikes // 2) * step, 2)
+    strike = strike[strike > 0]
+    t = days / 365
+
+    moneyness = np.log(strike / spot)
+    iv = np.clip(base_iv - 0.8 * moneyness + 2.5 * moneyness ** 2, 0.05, 3.0)
+    vol_t = iv * np.sqrt(t)
+    d1 = (-moneyness + 0.5 * vol_t ** 2) / vol_t
+    gamma = np.exp(-0.5 * d1 ** 2) / (np.sqrt(2 * np.pi) * spot * vol_t)
+    vega = spot * np.exp(-0.5 * d1 ** 2) / np.sqrt(2 * np.pi) * np.sqrt(t) / 100
+    call_delta = _norm_cdf(d1)
+
+    # Open interest: bell around spot, lognormal noise, round strikes attract size
+    width = max(4 * base_iv * np.sqrt(t), 0.02)
+    round_bonus = np.where(np.isclose(strike % 5, 0) | np.isclose(strike % 5, 5), 3.0, 1.0)
+
+    sides = []
+    for option_type, delta, skew in (('Call', call_delta, 0.8), ('Put', call_delta - 1, 1.2)):
+        oi = 40000 * skew * np.exp(-0.5 * (moneyness / width) ** 2) * round_bonus
+        oi = np.floor(oi * rng.lognormal(0, 0.6, len(strike)))
+        intrinsic = np.maximum(0, (spot - strike) if option_type == 'Call' else (strike - spot))
+        sides.append(pd.DataFrame({
+            'symbol': [f'SYN|{days}{option_type[0]}{k:.2f}' for k in strike],
+            'strikePrice': strike,
+            'lastPrice': intrinsic + spot * vol_t * 0.4 * np.exp(-0.5 * d1 ** 2),
+            'volatility': iv * 100,
+            'delta': delta,
+            'gamma': gamma,
+            'theta': -spot * gamma * iv ** 2 * spot / 730,
+            'vega': vega,
+            'volume': np.floor(oi * rng.uniform(0, 0.3, len(strike))),
+            'openInterest': oi,
+            'optionType': option_type,
+        }))
+    return compact_chain(pd.concat(sides, ignore_index=True))
+
+
+def barchart_payload(raw_df, spot):
+    """A chain shaped like a Barchart options/get response (grouped by optionType, string fields + raw)"""
+    data = {}
+    for option_type, side in raw_df.groupby('optionType', observed=True, sort=False):
+        rows = side.drop(columns=['optionType']).to_dict('records')
+        data[str(option_type)] = [
+            {**{k: str(v) for k, v in row.items()}, 'baseLastPrice': f'{spot:.2f}',
+             'raw': {**row, 'baseLastPrice': spot}}
+            for row in rows]
+    return {'count': len(raw_df), 'total': len(raw_df), 'data': data}
@@ -0,0 +1,122 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+
+SPAN_HISTORY = 5000  # Most recent spans kept for percentiles and export
+QUANTILES = (0.5, 0.95)
+
+
+class SpanRecorder:
+    """
+    Process-wide latency spans per pipeline stage.
+
+    ``with span('barchart.api', ticker='SPY') as s: ...; s['bytes'] = n``
+    times the block and keeps its attributes. Percentiles come from the last
+    SPAN_HISTORY spans; counts, seconds and bytes totals are cumulative so the
+    Prometheus export behaves like a normal summary. Spans opened inside
+    ``with muted():`` on the same thread are not recorded.
+    """
+
+    def __init__(self, maxlen=SPAN_HISTORY):
+        self._spans = deque(maxlen=maxlen)
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def muted(self):
+        """Skip spans opened on this thread inside the block, e.g. background work reusing dashboard stages"""
+        previous = getattr(self._local, 'muted', False)
+        self._local.muted = True
+        try:
+            yield
+        finally:
+            self._local.muted = previous
+
+    @contextmanager
+    def span(self, stage, **attrs):
+        if getattr(self._local, 'muted', False):
+            yield attrs
+            return
+        started, wall, error = time.perf_counter(), time.time(), None
+        try:
+            yield attrs
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - started, wall, error, attrs)
+
+    def record(self, stage, seconds, wall=None, error=None, attrs=None):
+        entry = {'ts': wall if wall is not None else time.time(), 'stage': stage, 'seconds': seconds,
+                 'error': error, **(attrs or {})}
+        with self._lock:
+            self._spans.append(entry)
+            totals = self._totals.setdefault(stage, {'count': 0, 'seconds': 0.0, 'bytes': 0, 'errors': 0})
+            totals['count'] += 1
+            totals['seconds'] += seconds
+            totals['bytes'] += entry.get('bytes', 0)
+            totals['errors'] += error is not None
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def summary(self):
+        """One row per stage: count, p50/p95/max in ms, errors and mean payload size"""
+        by_stage = {}
+        for entry in self.spans():
+            by_stage.setdefault(entry['stage'], []).append(entry)
+        rows = []
+        for stage, entries in sorted(by_stage.items()):
+            ms = np.array([e['seconds'] for e in entries]) * 1000
+            sizes = [e['bytes'] for e in entries if 'bytes' in e]
+            rows.append({
+                'stage': stage,
+                'count': len(entries),
+                'p50_ms': round(float(np.percentile(ms, 50)), 2),
+                'p95_ms': round(float(np.percentile(ms, 95)), 2),
+                'max_ms': round(float(ms.max()), 2),
+                'errors': sum(e['error'] is not None for e in entries),
+                'avg_kb': round(sum(sizes) / len(sizes) / 1024, 1) if sizes else None,
+            })
+        return rows
+
+    def to_jsonl(self):
+        """Recent spans, one JSON object per line"""
+        return ''.join(json.dumps(entry, default=str) + '\n' for entry in self.spans())
+
+    def to_prometheus(self, prefix='gex'):
+        """Prometheus text exposition: a latency summary and a payload bytes counter per stage"""
+        by_stage = {}
+        for entry in self.spans():
+            by_stage.setdefault(entry['stage'], []).append(entry['seconds'])
+        with self._lock:
+            totals = {stage: dict(t) for stage, t in self._totals.items()}
+
+        lines = [f'# HELP {prefix}_stage_seconds Pipeline stage latency.',
+                 f'# TYPE {prefix}_stage_seconds summary']
+        for stage, t in sorted(totals.items()):
+            for q in QUANTILES:
+                value = float(np.quantile(by_stage[stage], q)) if stage in by_stage else float('nan')
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {t["seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {t["count"]}')
+        lines += [f'# HELP {prefix}_stage_errors_total Pipeline stage failures.',
+                  f'# TYPE {prefix}_stage_errors_total counter']
+        lines += [f'{prefix}_stage_errors_total{{stage="{stage}"}} {t["errors"]}' for stage, t in sorted(totals.items())]
+        lines += [f'# HELP {prefix}_stage_bytes_total Payload bytes handled per stage.',
+                  f'# TYPE {prefix}_stage_bytes_total counter']
+        lines += [f'{prefix}_stage_bytes_total{{stage="{stage}"}} {t["bytes"]}'
+                  for stage, t in sorted(totals.items()) if t['bytes']]
+        return '\n'.join(lines) + '\n'
+
+
+RECORDER = SpanRecorder()
+span = RECORDER.span
+muted = RECORDER.muted
@@ -0,0 +1,209 @@
+import time
+import random
+import threading
+
+import requests
+
+
+# Statuses worth retrying: throttling and server-side hiccups
+TRANSIENT_STATUS = (429, 500, 502, 503, 504)
+
+# Per-upstream limits; anything not listed gets DEFAULT_LIMITS
+DEFAULT_LIMITS = {'rate': 2.0, 'burst': 4}
+UPSTREAM_LIMITS = {
+    'www.barchart.com': {'rate': 2.0, 'burst': 4},
+    'yfinance': {'rate': 2.0, 'burst': 4},
+}
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class TokenBucket:
+    """
+    Token-bucket limiter whose rate adapts to the upstream: a 429 halves it,
+    every success creeps it back toward the configured ceiling.
+    """
+
+    def __init__(self, rate, burst, min_rate=0.1):
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = min_rate
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available; returns seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def slow_down(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + 0.1 * self.max_rate)
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures, lets one probe through after ``reset_after`` seconds"""
+
+    def __init__(self, threshold=5, reset_after=30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.reset_after else 'open'
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_after and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def retry_in(self):
+        return 0.0 if self.opened_at is None else max(0.0, self.reset_after - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.failures, self.opened_at, self.probing = 0, None, False
+
+    def record_failure(self):
+        """Count a failure, returns True when this one opened the breaker"""
+        with self._lock:
+            self.failures += 1
+            was_closed = self.opened_at is None
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at, self.probing = time.monotonic(), False
+                return was_closed
+            return False
+
+
+class UpstreamGuard:
+    """
+    Rate limit, retry and circuit-break every call to one upstream.
+
+    ``call(fn)`` runs ``fn()`` (an HTTP request or a client-library call)
+    behind the token bucket. Connection errors, timeouts and
+    TRANSIENT_STATUS responses are retried with full-jitter exponential
+    backoff; once retries are exhausted the failure counts toward the
+    breaker. Other responses are returned as-is for the caller to judge.
+    """
+
+    def __init__(self, name, rate=2.0, burst=4, retries=3, backoff=0.5, max_backoff=8.0,
+                 threshold=5, reset_after=30.0, transient=(requests.ConnectionError, requests.Timeout)):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(threshold, reset_after)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.transient = transient
+        self.counters = {'calls': 0, 'attempts': 0, 'retries': 0, 'throttled': 0, 'throttle_wait_s': 0.0,
+                         'rate_cuts': 0, 'failures': 0, 'short_circuited': 0, 'breaker_opens': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counters[key] += n
+
+    def call(self, fn, error_log=None):
+        error_log = error_log if error_log is not None else []
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpen(f"{self.name} circuit open, retrying in {self.breaker.retry_in():.0f}s")
+
+        self._count('calls')
+        for attempt in range(self.retries + 1):
+            waited = self.bucket.acquire()
+            if waited > 0:
+                self._count('throttled')
+                self._count('throttle_wait_s', waited)
+            self._count('attempts')
+
+            try:
+                result = fn()
+            except self.transient as e:
+                reason, result, error = type(e).__name__, None, e
+            except Exception:
+                # Not retried, but still a failed call: a half-open probe must not stay pending
+                self._count('failures')
+                if self.breaker.record_failure():
+                    self._count('breaker_opens')
+                raise
+            else:
+                status = getattr(result, 'status_code', None)
+                if status not in TRANSIENT_STATUS:
+                    self.breaker.record_success()
+                    self.bucket.speed_up()
+                    return result
+                reason, error = f"HTTP {status}", None
+                if status == 429:
+                    self.bucket.slow_down()
+                    self._count('rate_cuts')
+
+            if attempt == self.retries:
+                break
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            retry_after = getattr(result, 'headers', {}).get('Retry-After', '') if result is not None else ''
+            if retry_after.isdigit():
+                delay = max(delay, min(float(retry_after), self.max_backoff))
+            self._count('retries')
+            error_log.append(f"⚠ {self.name}: {reason}, retry {attempt + 1}/{self.retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+        self._count('failures')
+        if self.breaker.record_failure():
+            self._count('breaker_opens')
+            error_log.append(f"⚠ {self.name}: circuit opened after {self.breaker.failures} failures")
+        if error is not None:
+            raise error
+        return result
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        counters['throttle_wait_s'] = round(counters['throttle_wait_s'], 2)
+        return {'upstream': self.name, 'breaker': self.breaker.state, 'rate_per_s': round(self.bucket.rate, 2),
+                **counters}
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def guard(name):
+    """Process-wide guard for one upstream host (or client library), created on first use"""
+    with _guards_lock:
+        if name not in _guards:
+            limits = UPSTREAM_LIMITS.get(name, DEFAULT_LIMITS)
+            transient = (Exception,) if name == 'yfinance' else (requests.ConnectionError, requests.Timeout)
+            _guards[name] = UpstreamGuard(name, transient=transient, **limits)
+        return _guards[name]
+
+
+def upstream_stats():
+    """Counter rows for every upstream used so far"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return [g.stats() for g in guards]